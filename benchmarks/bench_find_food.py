@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from auto_nutrition import FOODS, FoodItem, find_food  # noqa: E402
+
+LINES = 10_000
+REPEATS = 5
+ADJECTIVES = ("diced", "shredded", "fresh", "frozen", "chopped", "low-sodium", "large", "canned")
+UNMATCHED = ("cornstarch", "soy sauce", "lemon zest", "fresh basil", "vanilla extract", "baking soda")
+
+
+def legacy_find_food(ingredient_text: str) -> FoodItem | None:
+    for food in sorted(FOODS, key=lambda f: max(len(k) for k in f.keywords), reverse=True):
+        for keyword in food.keywords:
+            if keyword in ingredient_text:
+                return food
+    return None
+
+
+def synthetic_lines(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    keywords = [keyword for food in FOODS for keyword in food.keywords]
+    lines: list[str] = []
+    for _ in range(count):
+        name = rng.choice(UNMATCHED) if rng.random() < 0.1 else rng.choice(keywords)
+        words = [name]
+        if rng.random() < 0.5:
+            words.insert(0, rng.choice(ADJECTIVES))
+        if rng.random() < 0.3:
+            words.append(f", {rng.choice(ADJECTIVES)}")
+        lines.append(" ".join(words))
+    return lines
+
+
+def best_time(fn, lines: list[str]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    lines = synthetic_lines(LINES)
+    legacy = best_time(legacy_find_food, lines)
+    current = best_time(find_food, lines)
+    differ = sum(1 for line in lines if legacy_find_food(line) is not find_food(line))
+    print(f"{LINES} synthetic ingredient lines, best of {REPEATS}")
+    print(f"  legacy sort + substring scan: {legacy * 1000:8.1f} ms ({legacy / LINES * 1e6:.2f} us/line)")
+    print(f"  compiled token trie:          {current * 1000:8.1f} ms ({current / LINES * 1e6:.2f} us/line)")
+    print(f"  speedup: {legacy / current:.1f}x, lines matched differently: {differ}")
+
+
+if __name__ == "__main__":
+    main()
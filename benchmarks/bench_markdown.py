@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import html
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from generate_recipe_book import markdown_to_html  # noqa: E402
+
+DEFAULT_MB = 50
+WORDS = ("chicken", "rice", "casserole", "bake", "cover", "foil", "pan", "cheese", "simmer", "freeze", "thaw", "serve")
+
+
+def legacy_slugify(text: str) -> str:
+    text = text.lower()
+    text = text.replace("'", "").replace("’", "")
+    text = re.sub(r"[^a-z0-9]+", "-", text)
+    return text.strip("-")
+
+
+def legacy_inline_md_to_html(text: str) -> str:
+    text = html.escape(text)
+    text = re.sub(r"`([^`]+)`", r"<code>\1</code>", text)
+    text = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", text)
+    text = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r'<a href="\2">\1</a>', text)
+    return text
+
+
+def legacy_markdown_to_html(md: str) -> str:
+    lines = md.splitlines()
+    out: list[str] = []
+    in_ul = False
+    in_ol = False
+
+    def close_lists() -> None:
+        nonlocal in_ul, in_ol
+        if in_ul:
+            out.append("</ul>")
+            in_ul = False
+        if in_ol:
+            out.append("</ol>")
+            in_ol = False
+
+    for raw_line in lines:
+        stripped = raw_line.rstrip().strip()
+        if not stripped:
+            close_lists()
+            continue
+        if stripped.startswith("# "):
+            close_lists()
+            heading_text = stripped[2:].strip()
+            out.append(f"<h1 id=\"{legacy_slugify(heading_text)}\">{legacy_inline_md_to_html(heading_text)}</h1>")
+            continue
+        if stripped.startswith("## "):
+            close_lists()
+            heading_text = stripped[3:].strip()
+            out.append(f"<h2 id=\"{legacy_slugify(heading_text)}\">{legacy_inline_md_to_html(heading_text)}</h2>")
+            continue
+        if stripped.startswith("### "):
+            close_lists()
+            heading_text = stripped[4:].strip()
+            out.append(f"<h3 id=\"{legacy_slugify(heading_text)}\">{legacy_inline_md_to_html(heading_text)}</h3>")
+            continue
+        if re.match(r"^\d+\.\s+", stripped):
+            if in_ul:
+                out.append("</ul>")
+                in_ul = False
+            if not in_ol:
+                out.append("<ol>")
+                in_ol = True
+            content = re.sub(r"^\d+\.\s+", "", stripped)
+            out.append(f"<li>{legacy_inline_md_to_html(content)}</li>")
+            continue
+        if stripped.startswith("- "):
+            if in_ol:
+                out.append("</ol>")
+                in_ol = False
+            if not in_ul:
+                out.append("<ul>")
+                in_ul = True
+            out.append(f"<li>{legacy_inline_md_to_html(stripped[2:].strip())}</li>")
+            continue
+        if stripped == "---":
+            close_lists()
+            out.append("<hr>")
+            continue
+        close_lists()
+        out.append(f"<p>{legacy_inline_md_to_html(stripped)}</p>")
+
+    close_lists()
+    return "\n".join(out)
+
+
+def synthetic_cookbook(megabytes: float, seed: int = 11) -> str:
+    rng = random.Random(seed)
+    target = int(megabytes * 1024 * 1024)
+    parts: list[str] = ["# Synthetic Cookbook", ""]
+    size = 0
+    number = 1
+    while size < target:
+        title = " ".join(rng.choice(WORDS).title() for _ in range(3))
+        block = "\n".join([
+            f"### {number}) {title} & Friends",
+            "**Serves/Yield:** 6",
+            f"**Estimated macros (auto):** ~{rng.randint(200, 700)} cal | 25g protein | 12g fat | 40g carbs",
+            "",
+            "### Ingredients",
+            *(f"- {rng.randint(1, 3)} cups {rng.choice(WORDS)}, `diced`" for _ in range(rng.randint(4, 10))),
+            "",
+            "### Instructions",
+            *(f"{i}. {' '.join(rng.choice(WORDS) for _ in range(8))} see [notes](#notes-{number})."
+              for i in range(1, rng.randint(3, 7))),
+            "",
+            "---",
+            "",
+        ])
+        parts.append(block)
+        size += len(block) + 1
+        number += 1
+    return "\n".join(parts)
+
+
+def throughput(fn, text: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = fn(text)
+    elapsed = time.perf_counter() - start
+    return len(text.encode("utf-8")) / (1024 * 1024) / elapsed, result
+
+
+def main() -> None:
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MB
+    text = synthetic_cookbook(megabytes)
+    book = (ROOT / "RECIPE_BOOK.md").read_text(encoding="utf-8")
+    if legacy_markdown_to_html(book) != markdown_to_html(book):
+        raise SystemExit("Rendered RECIPE_BOOK.md differs from the legacy renderer.")
+
+    legacy_rate, legacy_html = throughput(legacy_markdown_to_html, text)
+    current_rate, current_html = throughput(markdown_to_html, text)
+    print(f"Rendered {megabytes:g} MB synthetic cookbook")
+    print(f"  legacy multi-regex renderer: {legacy_rate:6.1f} MB/s")
+    print(f"  single-pass renderer:        {current_rate:6.1f} MB/s")
+    print(f"  speedup: {current_rate / legacy_rate:.2f}x, identical output: {legacy_html == current_html}")
+
+
+if __name__ == "__main__":
+    main()
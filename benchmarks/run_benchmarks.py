@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import auto_nutrition  # noqa: E402
+import generate_recipe_book  # noqa: E402
+from recipe_model import RecipeStore, parse_recipe  # noqa: E402
+from synth import generate_tree  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+STAGES = ("parse_ingredient_line", "find_food", "process_recipe", "markdown_to_html", "generate_recipe_book")
+
+
+def use_tree(root: Path) -> None:
+    auto_nutrition.ROOT = root
+    auto_nutrition.CACHE_PATH = root / ".cache" / "nutrition.json"
+    auto_nutrition.RECIPE_CACHE_DIR = root / ".cache" / "recipes"
+    book = generate_recipe_book
+    book.ROOT = root
+    book.INDEX = root / "RECIPE_INDEX.md"
+    book.DROP_OFF = root / "docs" / "drop-off-options.md"
+    book.TRANSPORT = root / "docs" / "simple-transport-meals.md"
+    book.MANIFEST = root / ".cache" / "book-manifest.json"
+    book.RECIPES = RecipeStore(None)
+
+
+def quiet(fn: Callable[[], object]) -> Callable[[], object]:
+    def run() -> object:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+
+    return run
+
+
+def measure(fn: Callable[[], object], repeats: int) -> dict[str, object]:
+    runs: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "runs_s": [round(value, 6) for value in runs],
+        "min_s": round(min(runs), 6),
+        "mean_s": round(statistics.fmean(runs), 6),
+        "peak_bytes": peak,
+    }
+
+
+def bench_size(workdir: Path, recipes: int, args: argparse.Namespace) -> dict[str, object]:
+    root = generate_tree(workdir / f"cookbook-{recipes}", recipes, args.seed, args.min_ingredients, args.max_ingredients)
+    use_tree(root)
+    paths = sorted(root.glob(auto_nutrition.RECIPE_GLOB))
+    lines = [line for path in paths for line in parse_recipe(path.read_text(encoding="utf-8")).ingredient_lines]
+    parsed = [auto_nutrition.parse_ingredient_line(line) for line in lines]
+    texts = [item[2] for item in parsed if item is not None]
+
+    for path in paths:
+        auto_nutrition.process_recipe(path)
+    quiet(lambda: generate_recipe_book.build_book(force=True))()
+    book_text = generate_recipe_book.default_cookbook().book.read_text(encoding="utf-8")
+
+    stages: dict[str, Callable[[], object]] = {
+        "parse_ingredient_line": lambda: [auto_nutrition.parse_ingredient_line(line) for line in lines],
+        "find_food": lambda: [auto_nutrition.find_food(text) for text in texts],
+        "process_recipe": lambda: [auto_nutrition.process_recipe(path) for path in paths],
+        "markdown_to_html": lambda: generate_recipe_book.markdown_to_html(book_text),
+        "generate_recipe_book": quiet(lambda: generate_recipe_book.build_book(force=True)),
+    }
+    results: dict[str, object] = {}
+    for name in args.stages:
+        results[name] = measure(stages[name], args.repeats)
+        print(f"  {name:<22} min {results[name]['min_s'] * 1000:10.1f} ms   peak {results[name]['peak_bytes'] / 1e6:8.1f} MB")
+    return {
+        "recipes": recipes,
+        "ingredient_lines": len(lines),
+        "book_bytes": len(book_text.encode("utf-8")),
+        "stages": results,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(current: dict[str, object], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {entry["recipes"]: entry["stages"] for entry in baseline["results"]}
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('revision')}):")
+    for entry in current["results"]:
+        old_stages = previous.get(entry["recipes"])
+        if old_stages is None:
+            continue
+        for name, stats in entry["stages"].items():
+            if name in old_stages:
+                ratio = stats["min_s"] / old_stages[name]["min_s"] if old_stages[name]["min_s"] else float("inf")
+                print(f"  {entry['recipes']:>7} recipes  {name:<22} {ratio:6.2f}x time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time both cookbook scripts on synthetic recipe trees.")
+    parser.add_argument("--sizes", default="100,1000", help="comma-separated recipe counts (100 to 100000)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--min-ingredients", type=int, default=4)
+    parser.add_argument("--max-ingredients", type=int, default=14)
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of stages")
+    parser.add_argument("--workdir", type=Path, help="where to generate trees (default: a temp directory)")
+    parser.add_argument("--output", type=Path, help="result JSON path (default: benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier result JSON to compare against")
+    args = parser.parse_args()
+    args.stages = [name for name in args.stages.split(",") if name]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    revision = git_revision()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or Path(tmp)
+        for size in (int(value) for value in args.sizes.split(",")):
+            print(f"{size} recipes:")
+            results.append(bench_size(workdir, size, args))
+
+    report = {
+        "meta": {
+            "revision": revision,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{revision or time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+    print(f"\nWrote {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
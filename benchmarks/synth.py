@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import random
+import shutil
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SECTION_NAMES = ("Freezer Meals", "Soups and Stews", "Breakfast", "Sides", "Desserts", "Slow Cooker", "Sheet Pan")
+QUANTITIES = ("1", "2", "3", "4", "1/2", "1/4", "3/4", "1 1/2", "2 1/2", "½", "¼", "1.5", "12", "16")
+UNITS = ("cup", "cups", "tbsp", "tablespoons", "tsp", "teaspoon", "lb", "lbs", "oz", "ounces", "can", "cans", "jar",
+         "package", "clove", "cloves", "stick", "")
+INGREDIENTS = (
+    "cooked chicken, shredded", "ground turkey", "ground beef", "pulled pork", "eggs", "egg noodles", "ziti pasta",
+    "penne", "cooked rice", "potatoes, cubed", "carrots, sliced", "celery", "onion, diced", "garlic, minced",
+    "garlic powder", "bell pepper, chopped", "broccoli florets", "spinach", "frozen mixed vegetables", "corn",
+    "peas", "black beans, drained", "kidney beans", "diced tomatoes", "tomato paste", "marinara sauce",
+    "chicken broth", "beef stock", "cream of chicken soup", "sour cream", "ricotta cheese", "cream cheese",
+    "shredded cheddar cheese", "mozzarella, shredded", "parmesan", "milk", "heavy cream", "butter", "olive oil",
+    "flour", "sugar", "brown sugar", "honey", "oats", "breadcrumbs", "tortillas", "italian seasoning",
+    "chili powder", "cumin", "paprika", "black pepper", "salt", "fresh basil", "soy sauce", "lemon zest",
+)
+STEPS = ("Preheat oven to 375F.", "Brown the meat with onion.", "Stir in the remaining ingredients.",
+         "Simmer for 20 minutes.", "Spread into a greased **9x13** pan.", "Cover with foil and freeze.",
+         "Top with cheese and bake until bubbly.", "Cool before packing in a `foil pan`.")
+
+
+def recipe_text(rng: random.Random, number: int, min_ingredients: int, max_ingredients: int) -> str:
+    ingredients = []
+    for _ in range(rng.randint(min_ingredients, max_ingredients)):
+        words = [rng.choice(QUANTITIES), rng.choice(UNITS), rng.choice(INGREDIENTS)]
+        ingredients.append("- " + " ".join(word for word in words if word))
+    if rng.random() < 0.3:
+        ingredients.append("- Salt and pepper to taste")
+    steps = [f"{i}. {rng.choice(STEPS)}" for i in range(1, rng.randint(3, 8))]
+    return "\n".join([
+        f"# Synthetic Dish {number}",
+        "",
+        "**Recipe Owner:** Benchmark",
+        f"**Serves/Yield:** {rng.choice(('4', '6', '8', '6 to 8', '10-12'))}",
+        f"**Prep time:** {rng.randint(5, 40)} min",
+        f"**Cook time:** {rng.randint(10, 90)} min",
+        "**Estimated macros (auto):** pending",
+        "",
+        "### Ingredients",
+        *ingredients,
+        "",
+        "### Instructions",
+        *steps,
+        "",
+        "### Transport Notes",
+        "- Foil pan with lid works best for delivery and reheating.",
+        "",
+    ])
+
+
+def generate_tree(
+    root: Path,
+    recipes: int,
+    seed: int = 1,
+    min_ingredients: int = 4,
+    max_ingredients: int = 14,
+) -> Path:
+    if root.exists():
+        shutil.rmtree(root)
+    (root / "docs").mkdir(parents=True)
+    for doc in ("drop-off-options.md", "simple-transport-meals.md"):
+        shutil.copy(ROOT / "docs" / doc, root / "docs" / doc)
+
+    rng = random.Random(seed)
+    sections: dict[str, list[str]] = {name: [] for name in SECTION_NAMES}
+    for number in range(1, recipes + 1):
+        section = rng.choice(SECTION_NAMES)
+        folder = section.lower().replace(" ", "-")
+        rel = f"recipes/{folder}/dish-{number}.md"
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(recipe_text(rng, number, min_ingredients, max_ingredients), encoding="utf-8")
+        sections[section].append(f"- [Synthetic Dish {number}]({rel})")
+
+    index = ["# Recipe Index", ""]
+    for section, entries in sections.items():
+        index.extend([f"## {section}", *entries, ""])
+    (root / "RECIPE_INDEX.md").write_text("\n".join(index), encoding="utf-8")
+    return root
@@ -1,12 +1,28 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
+import os
 import re
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable
+
+import food_database
+import profiling
+from recipe_model import CACHE_DIR as RECIPE_CACHE_DIR, Recipe, RecipeStore, parse_recipe, splice_macro_line
 
 ROOT = Path(__file__).resolve().parents[1]
 RECIPE_GLOB = "recipes/**/*.md"
+CACHE_PATH = ROOT / ".cache" / "nutrition.json"
+CACHE_VERSION = 4
+BATCH_BYTES = 64 * 1024
+BATCH_MAX_FILES = 64
+LINE_CACHE_SIZE = 50_000
 
 
 @dataclass(frozen=True)
@@ -134,10 +150,12 @@ UNIT_ALIASES = {
 
 
 def parse_servings(text: str) -> float:
-    m = re.search(r"\*\*Serves/Yield:\*\*\s*([^\n]+)", text, flags=re.IGNORECASE)
-    if not m:
+    return servings_value(parse_recipe(text).field("serves/yield"))
+
+
+def servings_value(serving_text: str | None) -> float:
+    if not serving_text:
         return 1.0
-    serving_text = m.group(1).strip()
     nums = re.findall(r"\d+(?:\.\d+)?", serving_text)
     if not nums:
         return 1.0
@@ -147,15 +165,22 @@ def parse_servings(text: str) -> float:
     return max(sum(values) / len(values), 1.0)
 
 
+INT_RE = re.compile(r"\d+")
+DECIMAL_RE = re.compile(r"\d+\.\d+")
+RATIO_RE = re.compile(r"\d+/\d+")
+SPACE_RE = re.compile(r"\s+")
+NON_LETTER_RE = re.compile(r"[^a-zA-Z]")
+
+
 def parse_qty(token: str) -> float | None:
     token = token.strip().lower()
     if token in FRACTIONS:
         return FRACTIONS[token]
-    if re.fullmatch(r"\d+", token):
+    if INT_RE.fullmatch(token):
         return float(token)
-    if re.fullmatch(r"\d+\.\d+", token):
+    if DECIMAL_RE.fullmatch(token):
         return float(token)
-    if re.fullmatch(r"\d+/\d+", token):
+    if RATIO_RE.fullmatch(token):
         n, d = token.split("/")
         if float(d) == 0:
             return None
@@ -171,7 +196,7 @@ def parse_ingredient_line(line: str) -> tuple[float, str, str] | None:
     if not body or "to taste" in body.lower():
         return None
 
-    tokens = re.split(r"\s+", body)
+    tokens = SPACE_RE.split(body)
     if not tokens:
         return None
 
@@ -188,7 +213,7 @@ def parse_ingredient_line(line: str) -> tuple[float, str, str] | None:
 
     unit = "unit"
     if idx < len(tokens):
-        candidate = re.sub(r"[^a-zA-Z]", "", tokens[idx]).lower()
+        candidate = NON_LETTER_RE.sub("", tokens[idx]).lower()
         if candidate in UNIT_ALIASES:
             unit = UNIT_ALIASES[candidate]
             idx += 1
@@ -223,20 +248,329 @@ def ingredient_to_grams(qty: float, unit: str, food: FoodItem) -> float:
     return qty * 50
 
 
+WORD_RE = re.compile(r"[a-z]+")
+NGRAM_SIZE = 3
+FUZZY_MIN_LENGTH = 6
+FUZZY_CACHE_SIZE = 10_000
+
+
+def plural_stems(token: str) -> tuple[str, ...]:
+    if token.endswith("es"):
+        return token, token[:-1], token[:-2]
+    if token.endswith("s"):
+        return token, token[:-1]
+    return (token,)
+
+
+def ngrams(word: str, size: int = NGRAM_SIZE) -> set[str]:
+    padded = f"^{word}$"
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    # Optimal string alignment distance (adjacent swaps count once); stops early past `limit`.
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before: list[int] | None = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyVocabulary:
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words = tuple(sorted(set(words)))
+        self._known = frozenset(self.words)
+        self._grams: dict[str, list[int]] = {}
+        for number, word in enumerate(self.words):
+            for gram in ngrams(word):
+                self._grams.setdefault(gram, []).append(number)
+        self._corrections: dict[str, str | None] = {}
+
+    def known(self, token: str) -> bool:
+        return any(stem in self._known for stem in plural_stems(token))
+
+    def correct(self, token: str) -> str | None:
+        try:
+            return self._corrections[token]
+        except KeyError:
+            pass
+        result = None
+        if len(token) >= FUZZY_MIN_LENGTH and not self.known(token):
+            result = self._closest(token)
+        if len(self._corrections) >= FUZZY_CACHE_SIZE:
+            self._corrections.clear()
+        self._corrections[token] = result
+        return result
+
+    def _closest(self, token: str) -> str | None:
+        limit = 1 if len(token) < 8 else 2
+        grams = ngrams(token)
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for number in self._grams.get(gram, ()):
+                shared[number] = shared.get(number, 0) + 1
+        # Each edit touches at most NGRAM_SIZE n-grams, so closer words must share the rest.
+        needed = len(grams) - NGRAM_SIZE * limit
+        best_distance = limit
+        candidates: list[str] = []
+        for number, count in shared.items():
+            word = self.words[number]
+            if count < needed or word[0] != token[0]:
+                continue
+            distance = edit_distance(token, word, best_distance)
+            if distance > best_distance:
+                continue
+            if distance < best_distance or not candidates:
+                best_distance, candidates = distance, [word]
+            else:
+                candidates.append(word)
+        if not candidates:
+            return None
+        # A tie between singular and plural ("tomato"/"tomatoes") is still one word.
+        root = min(candidates, key=len)
+        return root if all(root in plural_stems(word) for word in candidates) else None
+
+    def correct_tokens(self, tokens: list[str]) -> list[str]:
+        known = self._known
+        seen = self._corrections
+        corrected = tokens
+        for position, token in enumerate(tokens):
+            if token in known:
+                continue
+            replacement = seen[token] if token in seen else self.correct(token)
+            if replacement is not None:
+                if corrected is tokens:
+                    corrected = list(tokens)
+                corrected[position] = replacement
+        return corrected
+
+
+class _TrieNode:
+    __slots__ = ("children", "hit")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.hit: tuple[int, int, FoodItem] | None = None
+
+    def step(self, token: str) -> _TrieNode | None:
+        child = self.children.get(token)
+        # Plural tokens fall back to their singular keyword ("onions" -> "onion").
+        if child is None and token.endswith("s"):
+            child = self.children.get(token[:-1])
+            if child is None and token.endswith("es"):
+                child = self.children.get(token[:-2])
+        # Singular tokens fall forward to a keyword that only exists in the plural ("tomato" -> "tomatoes").
+        if child is None:
+            child = self.children.get(token + "s")
+            if child is None:
+                child = self.children.get(token + "es")
+        return child
+
+
+class FoodMatcher:
+    def __init__(
+        self, foods: Iterable[FoodItem], fuzzy: bool = True, database: food_database.FoodDatabase | None = None
+    ) -> None:
+        self._root = _TrieNode()
+        keywords = [
+            (order, food, keyword, WORD_RE.findall(keyword.lower()))
+            for order, food in enumerate(foods)
+            for keyword in food.keywords
+        ]
+        vocabulary = {token for *_, tokens in keywords for token in tokens}
+        for order, food, keyword, tokens in keywords:
+            node = self._root
+            for token in tokens:
+                # Plural tokens share their singular's node when both are keywords, so "tomato" reaches
+                # "tomatoes" even though "tomato paste" gives "tomato" a node of its own.
+                key = next((stem for stem in plural_stems(token)[1:] if stem in vocabulary), token)
+                node = node.children.setdefault(key, _TrieNode())
+            if node.hit is None:
+                node.hit = (len(keyword), order, food)
+        self.fuzzy = FuzzyVocabulary(vocabulary) if fuzzy else None
+        # Foods from the external database are only built when a line first matches them.
+        self.database = database
+        self._external: dict[int, FoodItem] = {}
+        self._external_ids: dict[FoodItem, int] = {}
+
+    def find(self, text: str, fuzzy: bool = True) -> FoodItem | None:
+        tokens = WORD_RE.findall(text.lower())
+        corrected = self.fuzzy.correct_tokens(tokens) if fuzzy and self.fuzzy is not None else tokens
+        food = self._match(corrected)
+        if food is None and self.database is not None:
+            external = self.database.match(tokens)
+            if external is not None:
+                return self.external_food(external)
+        return food
+
+    def external_food(self, number: int) -> FoodItem:
+        food = self._external.get(number)
+        if food is None:
+            name, values = self.database.record(number)
+            food = FoodItem((name.lower(),), *values)
+            self._external[number] = food
+            self._external_ids.setdefault(food, number)
+        return food
+
+    def external_id(self, food: FoodItem) -> int | None:
+        return self._external_ids.get(food)
+
+    def corrections(self, text: str) -> list[tuple[str, str]]:
+        if self.fuzzy is None:
+            return []
+        tokens = WORD_RE.findall(text.lower())
+        return [(a, b) for a, b in zip(tokens, self.fuzzy.correct_tokens(tokens)) if a != b]
+
+    def _match(self, tokens: list[str]) -> FoodItem | None:
+        best: tuple[int, int, FoodItem] | None = None
+        for start in range(len(tokens)):
+            node: _TrieNode | None = self._root
+            for token in tokens[start:]:
+                node = node.step(token)
+                if node is None:
+                    break
+                hit = node.hit
+                if hit is not None and (best is None or hit[0] > best[0] or (hit[0] == best[0] and hit[1] < best[1])):
+                    best = hit
+        return best[2] if best is not None else None
+
+
+FOOD_DATABASE = food_database.FoodDatabase.open()
+FOOD_MATCHER = FoodMatcher(FOODS, database=FOOD_DATABASE)
+
+
 def find_food(ingredient_text: str) -> FoodItem | None:
-    for food in sorted(FOODS, key=lambda f: max(len(k) for k in f.keywords), reverse=True):
-        for keyword in food.keywords:
-            if keyword in ingredient_text:
-                return food
+    return FOOD_MATCHER.find(ingredient_text)
+
+
+FOOD_POSITIONS = {food: position for position, food in enumerate(FOODS)}
+
+
+def food_position(food: FoodItem) -> int:
+    position = FOOD_POSITIONS.get(food)
+    if position is None:
+        # External foods are numbered after the built-in table.
+        position = len(FOODS) + FOOD_MATCHER.external_id(food)
+    return position
+
+
+def food_at(position: int) -> FoodItem | None:
+    if 0 <= position < len(FOODS):
+        return FOODS[position]
+    number = position - len(FOODS)
+    if FOOD_DATABASE is not None and 0 <= number < len(FOOD_DATABASE):
+        return FOOD_MATCHER.external_food(number)
     return None
 
+LineResult = tuple[FoodItem, float] | None
+
+
+def normalize_ingredient_line(line: str) -> str | None:
+    line = line.strip()
+    if not line.startswith("- "):
+        return None
+    # Parsing only looks at lowercased, whitespace-split tokens, so this key resolves identically.
+    return "- " + " ".join(line[2:].split()).lower()
+
+
+def resolve_ingredient_line(line: str) -> LineResult:
+    parsed = parse_ingredient_line(line)
+    if parsed is None:
+        return None
+    qty, unit, ingredient_text = parsed
+    food = find_food(ingredient_text)
+    if food is None:
+        return None
+    return food, ingredient_to_grams(qty, unit, food)
+
+
+class LineCache:
+    def __init__(self, maxsize: int = LINE_CACHE_SIZE, track_fresh: bool = False) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, LineResult] = OrderedDict()
+        # Workers remember what they resolved so the parent can merge it into its own cache.
+        self._fresh: dict[str, LineResult] | None = {} if track_fresh else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def resolve(self, line: str) -> LineResult:
+        key = normalize_ingredient_line(line)
+        if key is None:
+            return None
+        if self.maxsize <= 0:
+            return resolve_ingredient_line(key)
+        try:
+            result = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            result = resolve_ingredient_line(key)
+            self._add(key, result)
+            if self._fresh is not None:
+                self._fresh[key] = result
+            return result
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return result
+
+    def _add(self, key: str, result: LineResult) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        while len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+
+    def take_fresh(self) -> list[list[object]]:
+        if not self._fresh:
+            return []
+        rows = self._rows(self._fresh.items())
+        self._fresh = {}
+        return rows
+
+    def dump(self) -> list[list[object]]:
+        return self._rows(self._entries.items())
+
+    def restore(self, rows: Iterable[list[object]]) -> None:
+        if self.maxsize <= 0:
+            return
+        for key, position, grams in rows:
+            if position is None:
+                self._add(str(key), None)
+            elif isinstance(position, int):
+                food = food_at(position)
+                if food is not None:
+                    self._add(str(key), (food, float(grams)))
+
+    @staticmethod
+    def _rows(items: Iterable[tuple[str, LineResult]]) -> list[list[object]]:
+        return [
+            [key, None, None] if result is None else [key, food_position(result[0]), result[1]]
+            for key, result in items
+        ]
+
+
+LINE_CACHE = LineCache()
+
 
 def extract_ingredients_block(text: str) -> list[str]:
-    m = re.search(r"### Ingredients\n(.*?)(\n### |\Z)", text, flags=re.DOTALL)
-    if not m:
-        return []
-    block = m.group(1)
-    return [line.rstrip() for line in block.splitlines() if line.strip().startswith("- ")]
+    return parse_recipe(text).ingredient_lines
 
 
 def format_macro_line(cal: float, protein: float, fat: float, carbs: float, servings: float, coverage: float) -> str:
@@ -251,33 +585,98 @@ def format_macro_line(cal: float, protein: float, fat: float, carbs: float, serv
 
 
 def update_macro_line(text: str, new_line: str) -> str:
-    if re.search(r"^\*\*Estimated macros \(auto\):\*\*.*$", text, flags=re.MULTILINE):
-        return re.sub(r"^\*\*Estimated macros \(auto\):\*\*.*$", new_line, text, flags=re.MULTILINE)
-    if re.search(r"^\*\*Cook time:\*\*.*$", text, flags=re.MULTILINE):
-        return re.sub(r"(^\*\*Cook time:\*\*.*$)", r"\1\n" + new_line, text, count=1, flags=re.MULTILINE)
-    lines = text.splitlines()
-    lines.insert(1, new_line)
-    return "\n".join(lines) + ("\n" if text.endswith("\n") else "")
+    pieces = splice_macro_line(parse_recipe(text), new_line)
+    return text if pieces is None else "".join(pieces)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def tables_digest() -> str:
+    tables: tuple[object, ...] = (CACHE_VERSION, FOODS, UNIT_ALIASES, FRACTIONS)
+    if FOOD_DATABASE is not None:
+        tables += (FOOD_DATABASE.digest,)
+    payload = repr(tables)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NutritionCache:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.tables = tables_digest()
+        self.entries: dict[str, str] = {}
+        self.lines: list[list[object]] = []
+        self.seen: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("tables") == self.tables:
+            self.entries = dict(data.get("recipes", {}))
+            self.lines = list(data.get("lines", []))
+
+    def get(self, digest: str) -> str | None:
+        macro_line = self.entries.get(digest)
+        if macro_line is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.seen[digest] = macro_line
+        return macro_line
+
+    def put(self, digest: str, macro_line: str) -> None:
+        self.entries[digest] = macro_line
+        self.seen[digest] = macro_line
 
+    def merge(self, seen: dict[str, str], hits: int, misses: int) -> None:
+        self.entries.update(seen)
+        self.seen.update(seen)
+        self.hits += hits
+        self.misses += misses
 
-def process_recipe(path: Path) -> tuple[bool, str]:
-    original = path.read_text(encoding="utf-8")
-    servings = parse_servings(original)
-    ingredient_lines = extract_ingredients_block(original)
+    def save(self, line_cache: LineCache | None = None) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data: dict[str, object] = {"tables": self.tables, "recipes": dict(sorted(self.seen.items()))}
+        if line_cache is not None and line_cache.maxsize > 0:
+            data["lines"] = line_cache.dump()
+        self.path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+
+
+def load_recipe(path: Path, store: RecipeStore | None = None) -> Recipe:
+    if store is not None:
+        return store.load(path)
+    return parse_recipe(path.read_text(encoding="utf-8"), path)
+
+
+def estimate_macro_line(recipe: Recipe) -> str:
+    servings = servings_value(recipe.field("serves/yield"))
+    ingredient_lines = recipe.ingredient_lines
 
     total_cal = total_p = total_f = total_c = 0.0
     matched = 0
 
     for line in ingredient_lines:
-        parsed = parse_ingredient_line(line)
-        if parsed is None:
-            continue
-        qty, unit, ingredient_text = parsed
-        food = find_food(ingredient_text)
-        if food is None:
+        resolved = LINE_CACHE.resolve(line)
+        if resolved is None:
             continue
 
-        grams = ingredient_to_grams(qty, unit, food)
+        food, grams = resolved
         factor = grams / 100.0
         total_cal += food.cal_per_100g * factor
         total_p += food.protein_per_100g * factor
@@ -285,40 +684,238 @@ def process_recipe(path: Path) -> tuple[bool, str]:
         total_c += food.carbs_per_100g * factor
         matched += 1
 
+    coverage = (matched / len(ingredient_lines)) if ingredient_lines else 0.0
+    return macro_line_for_totals(total_cal, total_p, total_f, total_c, servings, coverage)
+
+
+def macro_line_for_totals(cal: float, protein: float, fat: float, carbs: float, servings: float, coverage: float) -> str:
     if servings <= 0:
         servings = 1
-
-    coverage = (matched / len(ingredient_lines)) if ingredient_lines else 0.0
-    macro_line = format_macro_line(
-        cal=total_cal / servings,
-        protein=total_p / servings,
-        fat=total_f / servings,
-        carbs=total_c / servings,
+    return format_macro_line(
+        cal=cal / servings,
+        protein=protein / servings,
+        fat=fat / servings,
+        carbs=carbs / servings,
         servings=servings,
         coverage=coverage,
     )
 
-    updated = update_macro_line(original, macro_line)
-    changed = updated != original
-    if changed:
-        path.write_text(updated, encoding="utf-8")
+
+def apply_macro_line(
+    path: Path,
+    recipe: Recipe,
+    macro_line: str,
+    cache: NutritionCache | None = None,
+    store: RecipeStore | None = None,
+) -> tuple[bool, str]:
+    pieces = splice_macro_line(recipe, macro_line)
+    changed = pieces is not None
+    updated = recipe.text
+    if pieces is not None:
+        updated = "".join(pieces)
+        write_text_atomic(path, updated)
+        if store is not None:
+            store.store(path, updated)
+    if cache is not None:
+        cache.put(content_digest(updated), macro_line)
     return changed, f"{path.as_posix()}: {macro_line}"
 
 
+def cached_result(path: Path, recipe: Recipe, cache: NutritionCache | None) -> tuple[bool, str] | None:
+    if cache is None:
+        return None
+    cached_line = cache.get(content_digest(recipe.text))
+    if cached_line is None:
+        return None
+    return False, f"{path.as_posix()}: {cached_line}"
+
+
+def process_recipe(
+    path: Path,
+    cache: NutritionCache | None = None,
+    store: RecipeStore | None = None,
+) -> tuple[bool, str]:
+    recipe = load_recipe(path, store)
+    result = cached_result(path, recipe, cache)
+    if result is not None:
+        return result
+    return apply_macro_line(path, recipe, estimate_macro_line(recipe), cache, store)
+
+
+_WORKER_CACHE: tuple[Path, dict[str, str]] | None = None
+_WORKER_STORE: RecipeStore | None = None
+
+
+@dataclass
+class BatchResult:
+    results: list[tuple[bool, str]]
+    seen: dict[str, str] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+    lines: list[list[object]] = field(default_factory=list)
+    line_hits: int = 0
+    line_misses: int = 0
+
+
+def _init_worker(
+    cache_state: tuple[Path, dict[str, str]] | None,
+    recipe_cache_dir: Path | None,
+    line_state: tuple[int, list[list[object]]],
+) -> None:
+    global _WORKER_CACHE, _WORKER_STORE, LINE_CACHE
+    _WORKER_CACHE = cache_state
+    _WORKER_STORE = RecipeStore(recipe_cache_dir)
+    LINE_CACHE = LineCache(line_state[0], track_fresh=True)
+    LINE_CACHE.restore(line_state[1])
+
+
+def process_batch(paths: list[Path]) -> BatchResult:
+    cache = None
+    if _WORKER_CACHE is not None:
+        cache = NutritionCache(_WORKER_CACHE[0])
+        cache.entries = _WORKER_CACHE[1]
+    line_hits, line_misses = LINE_CACHE.hits, LINE_CACHE.misses
+    batch = BatchResult([process_recipe(path, cache, _WORKER_STORE) for path in paths])
+    batch.lines = LINE_CACHE.take_fresh()
+    batch.line_hits = LINE_CACHE.hits - line_hits
+    batch.line_misses = LINE_CACHE.misses - line_misses
+    if cache is not None:
+        batch.seen, batch.hits, batch.misses = cache.seen, cache.hits, cache.misses
+    return batch
+
+
+def batch_paths(paths: list[Path]) -> list[list[Path]]:
+    batches: list[list[Path]] = []
+    current: list[Path] = []
+    current_bytes = 0
+    for path in paths:
+        current.append(path)
+        current_bytes += path.stat().st_size
+        if current_bytes >= BATCH_BYTES or len(current) >= BATCH_MAX_FILES:
+            batches.append(current)
+            current = []
+            current_bytes = 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_recipes(
+    paths: list[Path],
+    cache: NutritionCache | None,
+    jobs: int,
+    store: RecipeStore | None = None,
+) -> list[tuple[bool, str]]:
+    if jobs <= 1 or len(paths) <= 1:
+        return [process_recipe(path, cache, store) for path in paths]
+
+    cache_state = (cache.path, cache.entries) if cache is not None else None
+    recipe_cache_dir = store.cache_dir if store is not None else None
+    results: list[tuple[bool, str]] = []
+    initargs = (cache_state, recipe_cache_dir, (LINE_CACHE.maxsize, LINE_CACHE.dump()))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as pool:
+        for batch in pool.map(process_batch, batch_paths(paths)):
+            results.extend(batch.results)
+            LINE_CACHE.restore(batch.lines)
+            LINE_CACHE.hits += batch.line_hits
+            LINE_CACHE.misses += batch.line_misses
+            if cache is not None:
+                cache.merge(batch.seen, batch.hits, batch.misses)
+    return results
+
+
+def run_vectorized(
+    paths: list[Path],
+    cache: NutritionCache | None,
+    store: RecipeStore | None = None,
+) -> list[tuple[bool, str]]:
+    try:
+        from nutrition_arrays import FoodTable
+    except ImportError as exc:
+        raise SystemExit(f"--vectorized needs NumPy ({exc}); install it with: pip install numpy") from exc
+
+    loaded = [(path, load_recipe(path, store)) for path in paths]
+    results = {path: cached_result(path, recipe, cache) for path, recipe in loaded}
+    pending = [(path, recipe) for path, recipe in loaded if results[path] is None]
+    macro_lines = FoodTable().macro_lines([recipe for _, recipe in pending])
+    for (path, recipe), macro_line in zip(pending, macro_lines):
+        results[path] = apply_macro_line(path, recipe, macro_line, cache, store)
+    return [results[path] for path in paths]
+
+
 def main() -> None:
-    recipes = sorted(ROOT.glob(RECIPE_GLOB))
+    parser = argparse.ArgumentParser(description="Add estimated calories/macros to every recipe.")
+    parser.add_argument("--cache", type=Path, default=CACHE_PATH, help="nutrition cache file")
+    parser.add_argument("--no-cache", action="store_true", help="re-estimate every recipe")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="worker processes (0 = one per CPU)")
+    parser.add_argument("--vectorized", action="store_true", help="estimate all recipes in one NumPy batch")
+    parser.add_argument(
+        "--line-cache-size", type=int, default=LINE_CACHE_SIZE, help="ingredient lines to memoize (0 = off)"
+    )
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    with profiling.profiled(args, "nutrition"):
+        run_nutrition(
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            cache_path=args.cache,
+            vectorized=args.vectorized,
+            line_cache_size=args.line_cache_size,
+        )
+
+
+def run_nutrition(
+    jobs: int = 1,
+    use_cache: bool = True,
+    cache_path: Path = CACHE_PATH,
+    store: RecipeStore | None = None,
+    vectorized: bool = False,
+    line_cache_size: int = LINE_CACHE_SIZE,
+    paths: Iterable[Path] | None = None,
+) -> None:
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    recipes = sorted(set(paths)) if paths is not None else sorted(ROOT.glob(RECIPE_GLOB))
     if not recipes:
         print("No recipes found.")
         return
 
+    cache = None
+    if use_cache:
+        cache = NutritionCache(cache_path)
+        cache.load()
+        if paths is not None:
+            # Only some recipes are estimated; keep the others' entries.
+            cache.seen.update(cache.entries)
+    LINE_CACHE.resize(line_cache_size)
+    LINE_CACHE.hits = LINE_CACHE.misses = 0
+    if cache is not None:
+        LINE_CACHE.restore(cache.lines)
+    if store is None:
+        store = RecipeStore(RECIPE_CACHE_DIR if use_cache else None)
+
     changed_count = 0
-    for recipe in recipes:
-        changed, msg = process_recipe(recipe)
+    if vectorized:
+        results = run_vectorized(recipes, cache, store)
+    else:
+        results = run_recipes(recipes, cache, jobs, store)
+    for changed, msg in results:
         if changed:
             changed_count += 1
         print(msg)
 
     print(f"\nUpdated {changed_count} recipe file(s).")
+    if cache is not None:
+        cache.save(LINE_CACHE)
+        print(f"Nutrition cache: {cache.hits} unchanged, {cache.misses} re-estimated.")
+    if paths is None:
+        pruned = store.prune(recipes)
+        if pruned:
+            print(f"Recipe parse cache: removed {pruned} stale entr{'y' if pruned == 1 else 'ies'}.")
+    if not vectorized:
+        print(
+            f"Ingredient line cache: {LINE_CACHE.hits} hits, {LINE_CACHE.misses} misses "
+            f"({len(LINE_CACHE)} lines kept)."
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import auto_nutrition
+import generate_recipe_book
+import profiling
+from recipe_model import CACHE_DIR as RECIPE_CACHE_DIR, RecipeStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Estimate recipe macros, then rebuild the cookbook and website.")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="nutrition worker processes (0 = one per CPU)")
+    parser.add_argument("--vectorized", action="store_true", help="estimate macros in one NumPy batch")
+    parser.add_argument("--no-cache", action="store_true", help="re-estimate and re-render everything")
+    parser.add_argument("--pages", action="store_true", help="write one page per section plus a search index")
+    parser.add_argument("--per-recipe", action="store_true", help="with --pages, also write one page per recipe")
+    parser.add_argument("--optimize", action="store_true", help="minify the site, hash CSS/JSON assets and precompress")
+    parser.add_argument("--watch", action="store_true", help="keep running and rebuild whenever recipes or docs change")
+    parser.add_argument("--config", type=Path, help="JSON file listing several cookbooks to build in one run")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    if args.config and args.watch:
+        parser.error("--watch builds a single cookbook; drop --config")
+    with profiling.profiled(args, "build"):
+        if args.config:
+            build_cookbooks(args)
+        else:
+            build(args)
+
+
+def build(args: argparse.Namespace) -> None:
+    store = RecipeStore(None if args.no_cache else RECIPE_CACHE_DIR, keep=True)
+    generate_recipe_book.RECIPES = store
+    timings: list[tuple[str, float]] = []
+
+    start = time.perf_counter()
+    auto_nutrition.run_nutrition(jobs=args.jobs, use_cache=not args.no_cache, store=store, vectorized=args.vectorized)
+    timings.append(("nutrition", time.perf_counter() - start))
+
+    print()
+    if args.watch:
+        import watcher
+
+        watcher.watch(store, use_cache=not args.no_cache, pages=args.pages, per_recipe=args.per_recipe)
+        return
+    stage_start = time.perf_counter()
+    generate_recipe_book.build_book(
+        force=args.no_cache, pages=args.pages, per_recipe=args.per_recipe, optimize=args.optimize
+    )
+    timings.append(("book", time.perf_counter() - stage_start))
+
+    import recipe_query
+
+    stage_start = time.perf_counter()
+    recipe_query.write_index(store, force=args.no_cache)
+    timings.append(("query", time.perf_counter() - stage_start))
+
+    import find_duplicates
+
+    print()
+    stage_start = time.perf_counter()
+    duplicates = find_duplicates.cached_duplicates(
+        sorted(auto_nutrition.ROOT.glob(auto_nutrition.RECIPE_GLOB)),
+        store.load,
+        cache_path=None if args.no_cache else find_duplicates.CACHE_PATH,
+    )
+    find_duplicates.print_report(duplicates)
+    timings.append(("duplicates", time.perf_counter() - stage_start))
+    timings.append(("total", time.perf_counter() - start))
+
+    print()
+    for stage, seconds in timings:
+        print(f"{stage:>10}: {seconds * 1000:8.1f} ms")
+    print(f"Recipe files read: {store.reads} (cached parses reused: {store.cache_hits})")
+
+
+def build_cookbooks(args: argparse.Namespace) -> None:
+    try:
+        books = generate_recipe_book.load_cookbooks(args.config)
+    except (OSError, ValueError) as exc:
+        sys.exit(f"Cannot read cookbook config: {exc}")
+
+    store = RecipeStore(None if args.no_cache else RECIPE_CACHE_DIR, keep=True)
+    generate_recipe_book.RECIPES = store
+    references: list[Path] = []
+    for book in books:
+        sections = generate_recipe_book.parse_index_sections(book.index.read_text(encoding="utf-8"), book.index.parent)
+        paths = [path for section in sections for path in section["paths"]]
+        if not any(path.exists() for path in paths):
+            index = generate_recipe_book.display_path(book.index)
+            print(f"Warning: cookbook {book.name!r} has no recipes; none of the {len(paths)} recipe link(s) in {index} exist.")
+        references.extend(paths)
+    # Recipes shared between cookbooks are parsed and estimated once; every book reuses the kept result.
+    distinct = sorted({path for path in references if path.exists()})
+    timings: list[tuple[str, float]] = []
+
+    start = time.perf_counter()
+    auto_nutrition.run_nutrition(
+        jobs=args.jobs, use_cache=not args.no_cache, store=store, vectorized=args.vectorized, paths=distinct
+    )
+    timings.append(("nutrition", time.perf_counter() - start))
+
+    for book in books:
+        print(f"\n[{book.name}] {generate_recipe_book.display_path(book.output)}")
+        stage_start = time.perf_counter()
+        generate_recipe_book.build_book(
+            force=args.no_cache, pages=args.pages, per_recipe=args.per_recipe, optimize=args.optimize, cookbook=book
+        )
+        timings.append((book.name, time.perf_counter() - stage_start))
+
+    import find_duplicates
+
+    print()
+    stage_start = time.perf_counter()
+    find_duplicates.print_report(
+        find_duplicates.cached_duplicates(
+            distinct, store.load, cache_path=None if args.no_cache else find_duplicates.CACHE_PATH
+        )
+    )
+    timings.append(("duplicates", time.perf_counter() - stage_start))
+    timings.append(("total", time.perf_counter() - start))
+
+    print()
+    width = max(len(stage) for stage, _ in timings)
+    for stage, seconds in timings:
+        print(f"{stage:>{width}}: {seconds * 1000:8.1f} ms")
+    print(
+        f"{len(books)} cookbook(s), {len(references)} recipe reference(s), {len(distinct)} distinct recipe file(s); "
+        f"parsed {store.reads}, cached parses reused: {store.cache_hits}"
+    )
+
+
+if __name__ == "__main__":
+    main()
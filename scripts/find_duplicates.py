@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from auto_nutrition import LINE_CACHE, RECIPE_GLOB, WORD_RE, parse_ingredient_line, tables_digest
+from generate_recipe_book import display_path
+from recipe_model import CACHE_DIR as RECIPE_CACHE_DIR, Recipe, RecipeStore
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = ROOT / ".cache" / "duplicates.json"
+CACHE_VERSION = 1
+THRESHOLD = 0.8
+PERMUTATIONS = 64
+BANDS = 16
+ROWS = PERMUTATIONS // BANDS
+SHINGLE_WORDS = 3
+MAX_BUCKET = 100
+PRIME = (1 << 31) - 1
+SIGNATURE_CHUNK = 1 << 16
+
+_rng = random.Random(20240611)
+# (a * x + b) mod PRIME with x < 2**32 stays below 2**63, so uint64 never overflows.
+COEFFICIENTS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(PERMUTATIONS)]
+
+
+def ingredient_features(recipe: Recipe) -> set[str]:
+    features = set()
+    for line in recipe.ingredient_lines:
+        resolved = LINE_CACHE.resolve(line)
+        if resolved is not None:
+            features.add(f"food:{resolved[0].keywords[0]}")
+            continue
+        parsed = parse_ingredient_line(line)
+        words = WORD_RE.findall(parsed[2] if parsed is not None else line.lower())
+        if words:
+            features.add("text:" + " ".join(words))
+    return features
+
+
+def instruction_features(recipe: Recipe) -> set[str]:
+    words: list[str] = []
+    for heading, lines in recipe.sections:
+        if heading.lower().startswith(("instruction", "direction", "method", "steps")):
+            for line in lines:
+                words.extend(WORD_RE.findall(line.lower()))
+    if len(words) < SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def feature_hashes(features: set[str]) -> list[int]:
+    return [zlib.crc32(feature.encode("utf-8")) for feature in features]
+
+
+def signatures(feature_sets: Sequence[set[str]]) -> list[tuple[int, ...] | None]:
+    hashed = [feature_hashes(features) for features in feature_sets]
+    if np is None:
+        return [
+            tuple(min((a * x + b) % PRIME for x in values) for a, b in COEFFICIENTS) if values else None
+            for values in hashed
+        ]
+
+    a = np.array([a for a, _ in COEFFICIENTS], dtype=np.uint64)[:, None]
+    b = np.array([b for _, b in COEFFICIENTS], dtype=np.uint64)[:, None]
+    result: list[tuple[int, ...] | None] = [None] * len(hashed)
+    owners = [number for number, values in enumerate(hashed) if values]
+    start = 0
+    while start < len(owners):
+        # Hash a slice of recipes at a time so the (permutations x features) block stays small.
+        end, size = start, 0
+        while end < len(owners) and (size == 0 or size + len(hashed[owners[end]]) <= SIGNATURE_CHUNK):
+            size += len(hashed[owners[end]])
+            end += 1
+        batch = owners[start:end]
+        values = np.fromiter((x for number in batch for x in hashed[number]), dtype=np.uint64, count=size)
+        offsets = np.cumsum([0] + [len(hashed[number]) for number in batch[:-1]])
+        minimums = np.minimum.reduceat((a * values[None, :] + b) % PRIME, offsets, axis=1)
+        for number, column in zip(batch, minimums.T.tolist()):
+            result[number] = tuple(column)
+        start = end
+    return result
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class Duplicates:
+    paths: list[Path]
+    titles: list[str]
+    pairs: dict[tuple[int, int], float] = field(default_factory=dict)
+    candidates: int = 0
+
+    def clusters(self) -> list[list[tuple[int, float]]]:
+        parent = list(range(len(self.paths)))
+
+        def find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        best: dict[int, float] = {}
+        for (left, right), score in self.pairs.items():
+            parent[find(left)] = find(right)
+            best[left] = max(best.get(left, 0.0), score)
+            best[right] = max(best.get(right, 0.0), score)
+        groups: dict[int, list[int]] = {}
+        for number in sorted(best, key=lambda number: self.paths[number]):
+            groups.setdefault(find(number), []).append(number)
+        clusters = [[(number, best[number]) for number in members] for members in groups.values()]
+        clusters.sort(key=lambda members: (-len(members), -max(score for _, score in members), self.paths[members[0][0]]))
+        return clusters
+
+
+def find_duplicates(recipes: Sequence[Recipe], threshold: float = THRESHOLD) -> Duplicates:
+    ingredients = [ingredient_features(recipe) for recipe in recipes]
+    instructions = [instruction_features(recipe) for recipe in recipes]
+    duplicates = Duplicates(
+        [recipe.path or Path(f"<recipe {number}>") for number, recipe in enumerate(recipes)],
+        [recipe.title or "" for recipe in recipes],
+    )
+
+    # Locality-sensitive hashing: recipes share a bucket when a band of their ingredient signature
+    # and the same band of their instruction signature both agree, so only those pairs are compared
+    # instead of all n^2 / 2. Requiring both keeps shared boilerplate steps from pairing everything.
+    buckets: dict[tuple[object, ...], list[int]] = {}
+    for number, (ingredient_sig, instruction_sig) in enumerate(zip(signatures(ingredients), signatures(instructions))):
+        if ingredient_sig is None and instruction_sig is None:
+            continue
+        for band in range(BANDS):
+            rows = slice(band * ROWS, (band + 1) * ROWS)
+            key = (band, ingredient_sig and ingredient_sig[rows], instruction_sig and instruction_sig[rows])
+            buckets.setdefault(key, []).append(number)
+
+    candidates: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        if len(members) > MAX_BUCKET:
+            # Huge buckets (e.g. one template submitted many times) only pair with their first recipe.
+            candidates.update((members[0], other) for other in members[1:])
+            continue
+        candidates.update((left, right) for position, left in enumerate(members) for right in members[position + 1:])
+
+    duplicates.candidates = len(candidates)
+    for left, right in candidates:
+        scores = [
+            jaccard(a[left], a[right]) for a in (ingredients, instructions) if a[left] or a[right]
+        ]
+        score = sum(scores) / len(scores) if scores else 0.0
+        if score >= threshold:
+            duplicates.pairs[(left, right)] = score
+    return duplicates
+
+
+def inputs_digest(paths: Sequence[Path], threshold: float) -> str:
+    # Features depend on the food tables (matched lines) and on each recipe's contents.
+    stamps: list[object] = [CACHE_VERSION, threshold, tables_digest()]
+    for path in paths:
+        st = path.stat()
+        stamps.append((str(path), st.st_mtime_ns, st.st_size))
+    return hashlib.sha256(repr(stamps).encode("utf-8")).hexdigest()
+
+
+def load_cached(path: Path, digest: str) -> Duplicates | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("inputs") != digest:
+        return None
+    duplicates = Duplicates(
+        [ROOT / rel for rel, _ in data["recipes"]], [title for _, title in data["recipes"]], candidates=data["candidates"]
+    )
+    duplicates.pairs = {(left, right): score for left, right, score in data["pairs"]}
+    return duplicates
+
+
+def save_cached(path: Path, digest: str, duplicates: Duplicates) -> None:
+    # Only recipes that are part of a pair are needed to print the report again.
+    members = sorted({number for pair in duplicates.pairs for number in pair})
+    renumber = {number: position for position, number in enumerate(members)}
+    data = {
+        "inputs": digest,
+        "candidates": duplicates.candidates,
+        "recipes": [[display_path(duplicates.paths[number]), duplicates.titles[number]] for number in members],
+        "pairs": [[renumber[left], renumber[right], score] for (left, right), score in sorted(duplicates.pairs.items())],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def cached_duplicates(
+    paths: Sequence[Path],
+    load: Callable[[Path], Recipe],
+    threshold: float = THRESHOLD,
+    cache_path: Path | None = CACHE_PATH,
+) -> Duplicates:
+    # Reuse the last result while no recipe has changed; any change recomputes every signature.
+    digest = inputs_digest(paths, threshold)
+    if cache_path is not None:
+        cached = load_cached(cache_path, digest)
+        if cached is not None:
+            return cached
+    duplicates = find_duplicates([load(path) for path in paths], threshold)
+    if cache_path is not None:
+        save_cached(cache_path, digest, duplicates)
+    return duplicates
+
+
+def print_report(duplicates: Duplicates, limit: int = 10) -> None:
+    clusters = duplicates.clusters()
+    if not clusters:
+        print("No likely duplicate recipes.")
+        return
+    recipes = sum(len(members) for members in clusters)
+    print(f"Likely duplicate recipes: {len(clusters)} cluster(s) covering {recipes} recipe(s).")
+    for members in clusters[:limit] if limit > 0 else clusters:
+        print()
+        for number, score in members:
+            print(f"  {score:.2f}  {display_path(duplicates.paths[number])}  ({duplicates.titles[number]})")
+    if 0 < limit < len(clusters):
+        print(f"\n... {len(clusters) - limit} more; run scripts/find_duplicates.py for the full list.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find clusters of near-duplicate recipes (MinHash + LSH).")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="minimum similarity (0-1) to report")
+    parser.add_argument("--limit", type=int, default=0, help="show at most this many clusters (0 = all)")
+    parser.add_argument("--json", action="store_true", help="print clusters as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the recipe parse cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = RecipeStore(None if args.no_cache else RECIPE_CACHE_DIR)
+    paths = sorted(ROOT.glob(RECIPE_GLOB))
+    duplicates = cached_duplicates(paths, store.load, args.threshold, None if args.no_cache else CACHE_PATH)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        clusters = [
+            [
+                {"path": display_path(duplicates.paths[number]), "title": duplicates.titles[number], "score": round(score, 3)}
+                for number, score in members
+            ]
+            for members in duplicates.clusters()
+        ]
+        print(json.dumps(clusters[: args.limit] if args.limit > 0 else clusters, indent=1, ensure_ascii=False))
+        return
+    print_report(duplicates, args.limit)
+    print(f"\nChecked {len(paths)} recipe(s), {duplicates.candidates} candidate pair(s) in {elapsed:.2f} s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import math
+import mmap
+import re
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+DATABASE_PATH = ROOT / ".cache" / "foods.bin"
+MAGIC = b"FOODDB\x00\x01"
+FORMAT_VERSION = 1
+MAX_KEYWORD_TOKENS = 6
+WORD_RE = re.compile(r"[a-z]+")
+KEYWORD_SPLIT_RE = re.compile(r"[;|]")
+
+# magic, version, foods, slots, longest keyword (tokens), records offset, slots offset, strings offset, source sha256
+HEADER = struct.Struct("<8sIIIIQQQ32s")
+# cal, protein, fat, carbs per 100 g, then cup/tbsp/tsp/unit/can/pkg grams (NaN = unknown), name offset, name length
+RECORD = struct.Struct("<10fIH2x")
+# keyword crc32, food id + 1 (0 = empty), keyword offset, keyword length
+SLOT = struct.Struct("<IIIH2x")
+
+NUTRIENT_COLUMNS = ("cal", "protein", "fat", "carbs")
+PORTION_COLUMNS = ("cup_g", "tbsp_g", "tsp_g", "unit_g", "can_g", "pkg_g")
+COLUMN_ALIASES = {
+    "name": ("description", "name", "food", "food_name", "food_description"),
+    "keywords": ("keywords", "aliases", "synonyms"),
+    "cal": ("cal", "calories", "kcal", "energy_kcal", "energy", "cal_per_100g"),
+    "protein": ("protein", "protein_g", "protein_per_100g"),
+    "fat": ("fat", "fat_g", "total_fat", "total_lipid_fat", "fat_per_100g"),
+    "carbs": ("carbs", "carbs_g", "carbohydrate", "carbohydrates", "carbohydrate_by_difference", "carbs_per_100g"),
+    "cup_g": ("cup_g", "cup", "grams_per_cup"),
+    "tbsp_g": ("tbsp_g", "tbsp", "grams_per_tbsp"),
+    "tsp_g": ("tsp_g", "tsp", "grams_per_tsp"),
+    "unit_g": ("unit_g", "unit", "each_g", "grams_per_unit"),
+    "can_g": ("can_g", "can", "grams_per_can"),
+    "pkg_g": ("pkg_g", "pkg", "package_g", "grams_per_pkg"),
+}
+
+
+def stem(token: str) -> str:
+    # Singular and plural spellings share one key ("tomatoes"/"tomato", "berries"/"berry").
+    if len(token) > 3 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("oes"):
+        return token[:-2]
+    if len(token) > 2 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def keyword_key(text: str) -> str:
+    return " ".join(stem(token) for token in WORD_RE.findall(text.lower()))
+
+
+def description_keywords(description: str) -> list[str]:
+    # USDA descriptions read "Cheese, mozzarella, whole milk"; recipes say "mozzarella cheese".
+    keywords = [description]
+    parts = [part.strip() for part in description.split(",") if part.strip()]
+    if len(parts) > 1:
+        keywords.append(f"{parts[1]} {parts[0]}")
+    return keywords
+
+
+def header_columns(fieldnames: Iterable[str]) -> dict[str, str]:
+    normalized = {re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_"): name for name in fieldnames}
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[column] = normalized[alias]
+                break
+    missing = [column for column in ("name", *NUTRIENT_COLUMNS) if column not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    return columns
+
+
+def number(value: str | None) -> float | None:
+    try:
+        parsed = float((value or "").strip())
+    except ValueError:
+        return None
+    return parsed if math.isfinite(parsed) and parsed >= 0 else None
+
+
+def read_foods(fh: Iterable[str]) -> Iterator[tuple[str, list[str], tuple[float, ...]] | None]:
+    reader = csv.DictReader(fh)
+    columns = header_columns(reader.fieldnames or [])
+    for row in reader:
+        name = " ".join((row.get(columns["name"]) or "").split())
+        nutrients = [number(row.get(columns[column])) for column in NUTRIENT_COLUMNS]
+        if not name or nutrients[0] is None:
+            yield None
+            continue
+        keywords = []
+        if "keywords" in columns:
+            keywords = [k.strip() for k in KEYWORD_SPLIT_RE.split(row.get(columns["keywords"]) or "") if k.strip()]
+        portions = [number(row.get(columns[column])) if column in columns else None for column in PORTION_COLUMNS]
+        values = tuple(value or 0.0 for value in nutrients) + tuple(math.nan if p is None else p for p in portions)
+        yield name, keywords + description_keywords(name), values
+
+
+def convert(source: Path, output: Path = DATABASE_PATH) -> tuple[int, int, int]:
+    digest = hashlib.sha256()
+    with source.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+
+    records = bytearray()
+    strings = bytearray()
+    keywords: dict[str, int] = {}
+    skipped = 0
+    longest = 0
+    with source.open(encoding="utf-8-sig", newline="") as fh:
+        for food in read_foods(fh):
+            if food is None:
+                skipped += 1
+                continue
+            name, food_keywords, values = food
+            food_id = len(records) // RECORD.size
+            encoded = name.encode("utf-8")[:0xFFFF]
+            records += RECORD.pack(*values, len(strings), len(encoded))
+            strings += encoded
+            for keyword in food_keywords:
+                key = keyword_key(keyword)
+                tokens = key.count(" ") + 1
+                # Earlier rows win a shared keyword, so put preferred entries first in the CSV.
+                if key and tokens <= MAX_KEYWORD_TOKENS and key not in keywords:
+                    keywords[key] = food_id
+                    longest = max(longest, tokens)
+
+    slot_count = 1 << max(4, (len(keywords) * 4 // 3).bit_length())
+    slots = [None] * slot_count
+    mask = slot_count - 1
+    for key, food_id in keywords.items():
+        encoded = key.encode("utf-8")
+        hashed = zlib.crc32(encoded)
+        position = hashed & mask
+        while slots[position] is not None:
+            position = (position + 1) & mask
+        slots[position] = (hashed, food_id + 1, len(strings), len(encoded))
+        strings += encoded
+    empty = SLOT.pack(0, 0, 0, 0)
+    slot_bytes = b"".join(empty if slot is None else SLOT.pack(*slot) for slot in slots)
+
+    food_count = len(records) // RECORD.size
+    records_offset = HEADER.size
+    slots_offset = records_offset + len(records)
+    strings_offset = slots_offset + len(slot_bytes)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, food_count, slot_count, longest, records_offset, slots_offset, strings_offset,
+        digest.digest(),
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.tmp")
+    with tmp.open("wb") as fh:
+        fh.write(header)
+        fh.write(records)
+        fh.write(slot_bytes)
+        fh.write(strings)
+    tmp.replace(output)
+    return food_count, len(keywords), skipped
+
+
+class FoodDatabase:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not a food database")
+        (magic, version, self.food_count, self.slot_count, self.longest, self._records, self._slots, self._strings,
+         source) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} food database; convert the CSV again")
+        self.digest = source.hex()
+        self._mask = self.slot_count - 1
+
+    @classmethod
+    def open(cls, path: Path = DATABASE_PATH) -> FoodDatabase | None:
+        return cls(path) if path.is_file() else None
+
+    def __len__(self) -> int:
+        return self.food_count
+
+    def lookup(self, key: str) -> int | None:
+        encoded = key.encode("utf-8")
+        hashed = zlib.crc32(encoded)
+        data = self._map
+        position = hashed & self._mask
+        while True:
+            slot_hash, food, offset, length = SLOT.unpack_from(data, self._slots + position * SLOT.size)
+            if not food:
+                return None
+            if slot_hash == hashed and length == len(encoded):
+                start = self._strings + offset
+                if data[start:start + length] == encoded:
+                    return food - 1
+            position = (position + 1) & self._mask
+
+    def match(self, tokens: list[str]) -> int | None:
+        stems = [stem(token) for token in tokens]
+        best: tuple[int, int] | None = None
+        for start in range(len(stems)):
+            key = ""
+            for token in stems[start:start + self.longest]:
+                key = f"{key} {token}" if key else token
+                food = self.lookup(key)
+                if food is not None and (best is None or len(key) > best[0] or (len(key) == best[0] and food < best[1])):
+                    best = (len(key), food)
+        return best[1] if best is not None else None
+
+    def record(self, food: int) -> tuple[str, tuple[float | None, ...]]:
+        *values, offset, length = RECORD.unpack_from(self._map, self._records + food * RECORD.size)
+        start = self._strings + offset
+        name = self._map[start:start + length].decode("utf-8")
+        # float32 storage; round back to the precision the CSV had.
+        return name, tuple(None if math.isnan(value) else round(value, 3) for value in values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a nutrient CSV into the binary food database auto_nutrition reads.")
+    parser.add_argument("csv", nargs="?", type=Path, help="CSV with description, calories, protein, fat, carbs (+ optional portions)")
+    parser.add_argument("--output", "-o", type=Path, default=DATABASE_PATH, help="database file to write")
+    parser.add_argument("--lookup", nargs="+", metavar="TEXT", help="look ingredient text up in the database")
+    args = parser.parse_args()
+    if args.csv is None and not args.lookup:
+        parser.error("give a CSV to convert or --lookup TEXT")
+
+    if args.csv is not None:
+        start = time.perf_counter()
+        try:
+            foods, keywords, skipped = convert(args.csv, args.output)
+        except ValueError as exc:
+            sys.exit(f"{args.csv}: {exc}")
+        elapsed = time.perf_counter() - start
+        size = args.output.stat().st_size
+        print(
+            f"Wrote {foods} food(s) and {keywords} keyword(s) to {args.output} ({size / 1e6:.1f} MB) in {elapsed:.1f} s"
+            + (f"; skipped {skipped} row(s) without a name or calories." if skipped else ".")
+        )
+
+    if args.lookup:
+        database = FoodDatabase.open(args.output)
+        if database is None:
+            sys.exit(f"{args.output} does not exist; convert a CSV first")
+        for text in args.lookup:
+            food = database.match(WORD_RE.findall(text.lower()))
+            if food is None:
+                print(f"{text}: no match")
+                continue
+            name, values = database.record(food)
+            print(f"{text}: {name} ({values[0]:g} kcal, {values[1]:g} g protein, {values[2]:g} g fat, {values[3]:g} g carbs per 100 g)")
+
+
+if __name__ == "__main__":
+    main()
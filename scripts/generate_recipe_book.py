@@ -1,27 +1,138 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import hashlib
 import html
+import io
+import itertools
+import json
+import os
 import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
+
+import profiling
+import site_assets
+from auto_nutrition import LINE_CACHE, WORD_RE, FoodItem, find_food, parse_ingredient_line
+from recipe_model import Recipe, RecipeStore
 
 ROOT = Path(__file__).resolve().parents[1]
-BOOK = ROOT / "RECIPE_BOOK.md"
 INDEX = ROOT / "RECIPE_INDEX.md"
 DROP_OFF = ROOT / "docs" / "drop-off-options.md"
 TRANSPORT = ROOT / "docs" / "simple-transport-meals.md"
-SITE = ROOT / "docs" / "index.html"
-NOJEKYLL = ROOT / "docs" / ".nojekyll"
-
-
+EXTRAS_PAGE = "drop-off-and-delivery.html"
+SITE_TITLE = "Neighbor Meals Cookbook"
+RECIPES = RecipeStore()
+SEARCH_STOPWORDS = frozenset({"and", "or", "of", "the", "to", "taste", "for", "with"})
+MANIFEST = ROOT / ".cache" / "book-manifest.json"
+READ_THREADS = 16
+READ_AHEAD = 4
+GENERATOR = Path(__file__).resolve()
+# Code the output depends on: parsing, food matching (search words) and --optimize.
+GENERATOR_FILES = [
+    GENERATOR,
+    *(GENERATOR.with_name(name) for name in ("recipe_model.py", "auto_nutrition.py", "food_database.py", "site_assets.py")),
+]
+T = TypeVar("T")
+
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+INLINE_RE = re.compile(r"`([^`]+)`|\*\*([^*]+)\*\*|\[([^\]]+)\]\(([^)]+)\)")
+BLOCK_RE = re.compile(r"(#{1,3}) (.*)|\d+\.\s+(.*)|- (.*)|(---)$")
+RECIPE_LINK_RE = re.compile(r"\(((?:[^()\s]*/)?recipes/[^()\s]+\.md)\)")
+MACROS_RE = re.compile(r"\*\*Estimated macros \(auto\):\*\*\s*~(\d+) cal \| (\d+)g protein \| (\d+)g fat \| (\d+)g carbs")
+
+
+@lru_cache(maxsize=4096)
 def slugify(text: str) -> str:
     text = text.lower()
     text = text.replace("'", "").replace("’", "")
-    text = re.sub(r"[^a-z0-9]+", "-", text)
+    text = SLUG_RE.sub("-", text)
     return text.strip("-")
 
 
-def parse_index_sections(index_text: str) -> list[dict[str, list[Path] | str]]:
+def display_path(path: Path) -> str:
+    return Path(os.path.relpath(path, ROOT)).as_posix()
+
+
+@dataclass
+class Cookbook:
+    name: str
+    index: Path
+    output: Path
+    manifest: Path
+    title: str = SITE_TITLE
+    drop_off: Path = DROP_OFF
+    transport: Path = TRANSPORT
+
+    @property
+    def book(self) -> Path:
+        return self.output / "RECIPE_BOOK.md"
+
+    @property
+    def docs(self) -> Path:
+        return self.output / "docs"
+
+    @property
+    def site(self) -> Path:
+        return self.docs / "index.html"
+
+    @property
+    def nojekyll(self) -> Path:
+        return self.docs / ".nojekyll"
+
+    @property
+    def section_pages(self) -> Path:
+        return self.docs / "sections"
+
+    @property
+    def recipe_pages(self) -> Path:
+        return self.docs / "recipes"
+
+    @property
+    def search_index(self) -> Path:
+        return self.docs / "search-index.json"
+
+
+def default_cookbook() -> Cookbook:
+    # The repository's own book: RECIPE_INDEX.md -> RECIPE_BOOK.md and docs/.
+    return Cookbook("default", INDEX, ROOT, MANIFEST, SITE_TITLE, DROP_OFF, TRANSPORT)
+
+
+def load_cookbooks(config: Path) -> list[Cookbook]:
+    data = json.loads(config.read_text(encoding="utf-8"))
+    entries = data.get("cookbooks") if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{config}: expected a non-empty \"cookbooks\" list")
+    base = config.resolve().parent
+    books: list[Cookbook] = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get("name") or not entry.get("index"):
+            raise ValueError(f"{config}: cookbook {number} needs a \"name\" and an \"index\"")
+        name = str(entry["name"])
+        if not slugify(name) or any(slugify(book.name) == slugify(name) for book in books):
+            raise ValueError(f"{config}: cookbook name {name!r} is empty or used twice")
+        book = Cookbook(
+            name,
+            base / entry["index"],
+            base / entry.get("output", f"build/{slugify(name)}"),
+            ROOT / ".cache" / "books" / f"{slugify(name)}.json",
+        )
+        book.title = str(entry.get("title", book.title))
+        for key in ("drop_off", "transport"):
+            if key in entry:
+                setattr(book, key, base / entry[key])
+        books.append(book)
+    return books
+
+
+def parse_index_sections(index_text: str, base: Path = ROOT) -> list[dict[str, list[Path] | str]]:
+    # Links are relative to the index file's folder (pass index.parent as base).
     sections: list[dict[str, list[Path] | str]] = []
     current: dict[str, list[Path] | str] | None = None
     for line in index_text.splitlines():
@@ -29,20 +140,100 @@ def parse_index_sections(index_text: str) -> list[dict[str, list[Path] | str]]:
             current = {"title": line[3:].strip(), "paths": []}
             sections.append(current)
             continue
-        m = re.search(r"\((recipes/[^)]+\.md)\)", line)
+        m = RECIPE_LINK_RE.search(line)
         if m and current is not None:
-            current["paths"].append(ROOT / m.group(1))
+            current["paths"].append(Path(os.path.normpath(base / m.group(1))))
     return sections
 
 
+def load_recipe(path: Path) -> Recipe:
+    recipe = RECIPES.load(path)
+    if recipe.title is None:
+        raise ValueError(f"Missing title heading in {path}")
+    return recipe
+
+
 def read_recipe(path: Path) -> tuple[str, str]:
-    text = path.read_text(encoding="utf-8").strip()
-    lines = text.splitlines()
-    if not lines or not lines[0].startswith("# "):
+    recipe = load_recipe(path)
+    return recipe.title, recipe.body
+
+
+@dataclass
+class ReadStats:
+    files: int = 0
+    missing: int = 0
+    bytes: int = 0
+    parsed: int = 0
+    seconds: float = 0.0
+    threads: int = 1
+
+    def summary(self) -> str:
+        rate = self.bytes / self.seconds / 1e6 if self.seconds else 0.0
+        missing = f", {self.missing} missing" if self.missing else ""
+        return (
+            f"Read {self.files} recipe file(s), {self.bytes / 1e6:.1f} MB in {self.seconds * 1000:.1f} ms "
+            f"({rate:.1f} MB/s, {self.threads} thread(s), {self.parsed} parsed{missing})."
+        )
+
+
+def read_ahead(pool: ThreadPoolExecutor, fn: Callable[[Path], T], paths: list[Path], window: int) -> Iterator[T]:
+    # Keep a bounded number of reads in flight: enough to hide latency, few enough that idle
+    # readers don't fight the parsing thread for the GIL.
+    pending: deque[Future[T]] = deque()
+    queued = iter(paths)
+    for path in itertools.islice(queued, window):
+        pending.append(pool.submit(fn, path))
+    while pending:
+        result = pending.popleft().result()
+        for path in itertools.islice(queued, 1):
+            pending.append(pool.submit(fn, path))
+        yield result
+
+
+def read_in_order(fn: Callable[[Path], T], paths: list[Path], threads: int) -> Iterator[T]:
+    if threads <= 1 or len(paths) <= 1:
+        yield from map(fn, paths)
+        return
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="recipe-read") as pool:
+        yield from read_ahead(pool, fn, paths, threads * READ_AHEAD)
+
+
+def stream_recipes(paths: list[Path], stats: ReadStats) -> Iterator[Recipe]:
+    # Reads overlap on a thread pool so network filesystems and cold caches don't serialize on latency;
+    # parsing stays on this thread (it holds the GIL anyway) and runs while later reads are in flight.
+    # Only the read-ahead window is held in memory; each recipe is dropped once the caller moves on.
+    store = RECIPES
+    found_all = read_in_order(store.read, paths, stats.threads)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            found = next(found_all)
+            if not isinstance(found, Recipe):
+                found = store.parse(path, *found)
+                stats.parsed += 1
+            if found.title is None:
+                raise ValueError(f"Missing title heading in {path}")
+            stats.files += 1
+            stats.bytes += found.stamp[1] if found.stamp else len(found.text.encode("utf-8"))
+            stats.seconds += time.perf_counter() - start
+            yield found
+    finally:
+        found_all.close()
+
+
+def read_recipe_title(path: Path) -> str:
+    with path.open(encoding="utf-8") as fh:
+        first = next((line.lstrip() for line in fh if line.strip()), "")
+    if not first.startswith("# "):
         raise ValueError(f"Missing title heading in {path}")
-    title = lines[0][2:].strip()
-    body = "\n".join(lines[1:]).strip()
-    return title, body
+    return first[2:].strip()
+
+
+def toc_title(path: Path) -> str | None:
+    try:
+        return load_recipe(path).title if RECIPES.keep else read_recipe_title(path)
+    except FileNotFoundError:
+        return None
 
 
 def read_doc_without_h1(path: Path) -> str:
@@ -53,111 +244,185 @@ def read_doc_without_h1(path: Path) -> str:
     return text
 
 
-def inline_md_to_html(text: str) -> str:
-    text = html.escape(text)
-    text = re.sub(r"`([^`]+)`", r"<code>\1</code>", text)
-    text = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", text)
-    text = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r'<a href="\2">\1</a>', text)
-    return text
+def _inline_token(m: re.Match[str]) -> str:
+    code, bold, link_text, href = m.groups()
+    if code is not None:
+        return f"<code>{code}</code>"
+    if bold is not None:
+        return f"<strong>{INLINE_RE.sub(_inline_token, bold)}</strong>"
+    return f'<a href="{href}">{INLINE_RE.sub(_inline_token, link_text)}</a>'
 
 
-def markdown_to_html(md: str) -> str:
-    lines = md.splitlines()
-    out: list[str] = []
-    in_ul = False
-    in_ol = False
-
-    def close_lists() -> None:
-        nonlocal in_ul, in_ol
-        if in_ul:
-            out.append("</ul>")
-            in_ul = False
-        if in_ol:
-            out.append("</ol>")
-            in_ol = False
-
-    for raw_line in lines:
-        line = raw_line.rstrip()
+def inline_md_to_html(text: str) -> str:
+    return INLINE_RE.sub(_inline_token, html.escape(text))
+
+
+class MarkdownRenderer:
+    def __init__(self, write: Callable[[str], object], started: bool = False) -> None:
+        self._write = write
+        self._started = started
+        self._list: str | None = None
+
+    def _emit(self, chunk: str) -> None:
+        if self._started:
+            self._write("\n")
+        self._started = True
+        self._write(chunk)
+
+    def _open_list(self, tag: str) -> None:
+        if self._list == tag:
+            return
+        if self._list is not None:
+            self._emit(f"</{self._list}>")
+        self._emit(f"<{tag}>")
+        self._list = tag
+
+    def close_lists(self) -> None:
+        if self._list is not None:
+            self._emit(f"</{self._list}>")
+            self._list = None
+
+    def feed(self, line: str) -> None:
         stripped = line.strip()
-
         if not stripped:
-            close_lists()
-            continue
-
-        if stripped.startswith("# "):
-            close_lists()
-            heading_text = stripped[2:].strip()
-            out.append(f"<h1 id=\"{slugify(heading_text)}\">{inline_md_to_html(heading_text)}</h1>")
-            continue
-        if stripped.startswith("## "):
-            close_lists()
-            heading_text = stripped[3:].strip()
-            out.append(f"<h2 id=\"{slugify(heading_text)}\">{inline_md_to_html(heading_text)}</h2>")
-            continue
-        if stripped.startswith("### "):
-            close_lists()
-            heading_text = stripped[4:].strip()
-            out.append(f"<h3 id=\"{slugify(heading_text)}\">{inline_md_to_html(heading_text)}</h3>")
-            continue
-
-        if re.match(r"^\d+\.\s+", stripped):
-            if in_ul:
-                out.append("</ul>")
-                in_ul = False
-            if not in_ol:
-                out.append("<ol>")
-                in_ol = True
-            content = re.sub(r"^\d+\.\s+", "", stripped)
-            out.append(f"<li>{inline_md_to_html(content)}</li>")
-            continue
-
-        if stripped.startswith("- "):
-            if in_ol:
-                out.append("</ol>")
-                in_ol = False
-            if not in_ul:
-                out.append("<ul>")
-                in_ul = True
-            out.append(f"<li>{inline_md_to_html(stripped[2:].strip())}</li>")
-            continue
-
-        if stripped == "---":
-            close_lists()
-            out.append("<hr>")
-            continue
-
-        close_lists()
-        out.append(f"<p>{inline_md_to_html(stripped)}</p>")
-
-    close_lists()
-    return "\n".join(out)
+            self.close_lists()
+            return
+
+        m = BLOCK_RE.match(stripped)
+        if m is None:
+            self.close_lists()
+            self._emit(f"<p>{inline_md_to_html(stripped)}</p>")
+            return
+
+        hashes, heading_text, ol_item, ul_item, rule = m.groups()
+        if hashes is not None:
+            self.close_lists()
+            heading_text = heading_text.strip()
+            level = len(hashes)
+            self._emit(f"<h{level} id=\"{slugify(heading_text)}\">{inline_md_to_html(heading_text)}</h{level}>")
+        elif ol_item is not None:
+            self._open_list("ol")
+            self._emit(f"<li>{inline_md_to_html(ol_item)}</li>")
+        elif ul_item is not None:
+            self._open_list("ul")
+            self._emit(f"<li>{inline_md_to_html(ul_item.strip())}</li>")
+        else:
+            self.close_lists()
+            self._emit("<hr>")
 
 
-def write_site_html(markdown_text: str) -> None:
-    body = markdown_to_html(markdown_text)
-    html_text = f"""<!doctype html>
+def markdown_to_html(md: str) -> str:
+    buffer = io.StringIO()
+    renderer = MarkdownRenderer(buffer.write)
+    for line in md.splitlines():
+        renderer.feed(line)
+    renderer.close_lists()
+    return buffer.getvalue()
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_record(path: Path) -> dict[str, int | str] | None:
+    try:
+        st = path.stat()
+        digest = file_digest(path)
+    except FileNotFoundError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+
+def record_matches(path: Path, record: dict[str, int | str] | None) -> bool:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return record is None
+    if record is None or st.st_size != record["size"]:
+        return False
+    if st.st_mtime_ns == record["mtime_ns"]:
+        return True
+    return file_digest(path) == record["sha256"]
+
+
+def load_manifest(path: Path) -> dict[str, dict[str, dict[str, int | str] | None]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def manifest_is_fresh(manifest: dict[str, dict[str, dict[str, int | str] | None]], options: dict[str, object]) -> bool:
+    if manifest.get("options") != options or not manifest.get("inputs") or not manifest.get("outputs"):
+        return False
+    for section in ("inputs", "outputs"):
+        for rel, record in manifest[section].items():
+            if not record_matches(ROOT / rel, record):
+                return False
+    return True
+
+
+def manifest_assets(manifest: dict[str, dict[str, dict[str, int | str] | None]]) -> list[Path]:
+    return [ROOT / rel for rel in manifest.get("assets", [])]
+
+
+def save_manifest(
+    path: Path, inputs: list[Path], outputs: list[Path], options: dict[str, object], assets: Iterable[Path] = ()
+) -> None:
+    def records(paths: list[Path]) -> dict[str, dict[str, int | str] | None]:
+        return {display_path(path): file_record(path) for path in paths}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "inputs": records(inputs),
+        "outputs": records([*outputs, *assets]),
+        "options": options,
+        "assets": sorted(display_path(path) for path in assets),
+    }
+    with path.open("w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=1, sort_keys=True)
+        fh.write("\n")
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    data = text.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+SITE_HEAD = """<!doctype html>
 <html lang=\"en\">
 <head>
   <meta charset=\"utf-8\">
   <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">
-  <title>Neighbor Meals Cookbook</title>
+  <title>{title}</title>
   <style>
-    :root {{
+    :root {
       --bg: #f8f5ee;
       --surface: #fffdf9;
       --ink: #2c2a26;
       --accent: #8f3f2a;
       --line: #e5ddd0;
-    }}
-    * {{ box-sizing: border-box; }}
-    body {{
+    }
+    * { box-sizing: border-box; }
+    body {
       margin: 0;
       font-family: Georgia, "Times New Roman", serif;
       color: var(--ink);
       background: radial-gradient(circle at top right, #f2eadc, var(--bg));
       line-height: 1.55;
-    }}
-    main {{
+    }
+    main {
       max-width: 920px;
       margin: 2rem auto;
       background: var(--surface);
@@ -165,77 +430,203 @@ def write_site_html(markdown_text: str) -> None:
       border-radius: 14px;
       padding: 2rem;
       box-shadow: 0 10px 25px rgba(0,0,0,.06);
-    }}
-    h1, h2, h3 {{ line-height: 1.2; }}
-    h1 {{ margin-top: 0; font-size: 2rem; color: var(--accent); }}
-    h2 {{ margin-top: 2rem; color: var(--accent); border-top: 1px solid var(--line); padding-top: 1rem; }}
-    h3 {{ margin-top: 1.25rem; }}
-    p, li {{ font-size: 1rem; }}
-    ul, ol {{ padding-left: 1.25rem; }}
-    hr {{ border: 0; border-top: 1px solid var(--line); margin: 1.5rem 0; }}
-    code {{ background: #f3ede2; padding: .1rem .3rem; border-radius: 4px; }}
-    a {{ color: var(--accent); }}
-    .meta {{ font-size: .95rem; color: #5f5546; margin-bottom: 1rem; }}
-    @media (max-width: 768px) {{
-      main {{ margin: 1rem; padding: 1.25rem; }}
-      h1 {{ font-size: 1.6rem; }}
-    }}
+    }
+    h1, h2, h3 { line-height: 1.2; }
+    h1 { margin-top: 0; font-size: 2rem; color: var(--accent); }
+    h2 { margin-top: 2rem; color: var(--accent); border-top: 1px solid var(--line); padding-top: 1rem; }
+    h3 { margin-top: 1.25rem; }
+    p, li { font-size: 1rem; }
+    ul, ol { padding-left: 1.25rem; }
+    hr { border: 0; border-top: 1px solid var(--line); margin: 1.5rem 0; }
+    code { background: #f3ede2; padding: .1rem .3rem; border-radius: 4px; }
+    a { color: var(--accent); }
+    .meta { font-size: .95rem; color: #5f5546; margin-bottom: 1rem; }
+    @media (max-width: 768px) {
+      main { margin: 1rem; padding: 1.25rem; }
+      h1 { font-size: 1.6rem; }
+    }
   </style>
 </head>
 <body>
   <main>
     <div class=\"meta\">Neighbor Meals Ward Cookbook</div>
-    {body}
+    """
+SITE_TAIL = """
   </main>
 </body>
 </html>
 """
-    SITE.write_text(html_text, encoding="utf-8")
-    NOJEKYLL.write_text("\n", encoding="utf-8")
 
 
-def main() -> None:
-    idx = INDEX.read_text(encoding="utf-8")
-    sections = parse_index_sections(idx)
-    section_recipes: list[tuple[str, list[tuple[int, str, str]]]] = []
-    toc_sections: list[tuple[str, list[tuple[int, str]]]] = []
+class OutputFile:
+    def __init__(self, path: Path, transform: Callable[[Path, str], str] | None = None) -> None:
+        self.path = path
+        self.changed = False
+        self._tmp = path.with_name(f".{path.name}.tmp")
+        self._digest = hashlib.sha256()
+        # A transform (e.g. minification) needs the whole text, so it is buffered and applied before comparing.
+        self._transform = transform
+        self._buffer = io.StringIO() if transform is not None else None
+
+    def __enter__(self) -> OutputFile:
+        self._fh = self._tmp.open("w", encoding="utf-8", newline="")
+        return self
+
+    def write(self, text: str) -> None:
+        if self._buffer is not None:
+            self._buffer.write(text)
+            return
+        self._fh.write(text)
+        self._digest.update(text.encode("utf-8"))
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc: object) -> None:
+        if self._buffer is not None and exc_type is None:
+            text = self._transform(self.path, self._buffer.getvalue())
+            self._fh.write(text)
+            self._digest.update(text.encode("utf-8"))
+        self._fh.close()
+        if exc_type is None and (not self.path.exists() or file_digest(self.path) != self._digest.hexdigest()):
+            self._tmp.replace(self.path)
+            self.changed = True
+        else:
+            self._tmp.unlink()
+
+
+SEARCH_WIDGET = """<input id=\"recipe-search\" type=\"search\" placeholder=\"Search recipes or ingredients\" aria-label=\"Search recipes\">
+    <ul id=\"search-results\"></ul>
+    <script>
+      (() => {
+        const box = document.getElementById("recipe-search");
+        const list = document.getElementById("search-results");
+        let index = null;
+        box.addEventListener("input", async () => {
+          index = index || await (await fetch("search-index.json")).json();
+          const terms = box.value.toLowerCase().split(/\\s+/).filter(Boolean);
+          list.replaceChildren();
+          if (!terms.length) return;
+          for (const recipe of index.recipes) {
+            const haystack = `${recipe.title} ${recipe.ingredients.join(" ")}`.toLowerCase();
+            if (!terms.every((term) => haystack.includes(term))) continue;
+            const link = document.createElement("a");
+            link.href = recipe.url;
+            link.textContent = recipe.title;
+            const item = document.createElement("li");
+            item.append(link);
+            list.append(item);
+          }
+        });
+      })();
+    </script>
+    """
+
+
+def render_site(site: OutputFile, lines: Iterable[str], title: str, before: str = "") -> None:
+    site.write(SITE_HEAD.replace("{title}", html.escape(title), 1))
+    site.write(before)
+    renderer = MarkdownRenderer(site.write)
+    for line in lines:
+        renderer.feed(line)
+    renderer.close_lists()
+    site.write(SITE_TAIL)
+
+
+def write_site_html(markdown_text: str, cookbook: Cookbook | None = None) -> list[Path]:
+    cookbook = cookbook or default_cookbook()
+    with OutputFile(cookbook.site) as site:
+        render_site(site, markdown_text.splitlines(), cookbook.title)
+    written = [cookbook.site] if site.changed else []
+    if write_if_changed(cookbook.nojekyll, "\n"):
+        written.append(cookbook.nojekyll)
+    return written
+
+
+def stream_book(
+    parts: Iterable[str],
+    cookbook: Cookbook,
+    single_page: bool = True,
+    optimizer: site_assets.SiteOptimizer | None = None,
+) -> list[Path]:
+    def book_lines() -> Iterator[str]:
+        first = True
+        for part in parts:
+            if not first:
+                book.write("\n")
+            book.write(part)
+            first = False
+            yield from part.splitlines() or [""]
+        book.write("\n")
+
+    if not single_page:
+        with OutputFile(cookbook.book) as book:
+            for _ in book_lines():
+                pass
+        return [cookbook.book] if book.changed else []
+
+    with OutputFile(cookbook.book) as book, OutputFile(cookbook.site, optimizer and optimizer.page) as site:
+        render_site(site, book_lines(), cookbook.title)
+    written = [output.path for output in (book, site) if output.changed]
+    if write_if_changed(cookbook.nojekyll, "\n"):
+        written.append(cookbook.nojekyll)
+    return written
+
+
+def build_toc(
+    sections: list[dict[str, list[Path] | str]], stats: ReadStats | None = None
+) -> list[tuple[str, list[tuple[int, str, Path]]]]:
+    # Only titles are kept here; bodies are streamed later by iter_book_chunks and write_site_pages.
+    unique = list(dict.fromkeys(path for section in sections for path in section["paths"]))
+    if stats is not None:
+        stats.threads = max(1, min(stats.threads, len(unique)))
+    # The shared in-memory store parses on demand, which must stay on this thread.
+    threads = 1 if stats is None or RECIPES.keep else stats.threads
+    titles = dict(zip(unique, read_in_order(toc_title, unique, threads)))
+    if stats is not None:
+        stats.missing = sum(1 for title in titles.values() if title is None)
+    toc_sections: list[tuple[str, list[tuple[int, str, Path]]]] = []
     counter = 1
-
     for section in sections:
-        section_title = str(section["title"])
-        section_entries: list[tuple[int, str]] = []
-        section_recipe_entries: list[tuple[int, str, str]] = []
+        section_entries: list[tuple[int, str, Path]] = []
         for path in section["paths"]:
-            if not path.exists():
+            title = titles[path]
+            if title is None:
                 continue
-            title, body = read_recipe(path)
-            section_entries.append((counter, title))
-            section_recipe_entries.append((counter, title, body))
+            section_entries.append((counter, title, path))
             counter += 1
-        toc_sections.append((section_title, section_entries))
-        section_recipes.append((section_title, section_recipe_entries))
+        toc_sections.append((str(section["title"]), section_entries))
+    return toc_sections
 
-    lines: list[str] = [
-        "# Neighbor Meals Cookbook",
-        "",
-        "A collection of simple, comforting meals designed for sharing with neighbors and friends during times of need.",
-        "",
+
+def toc_paths(toc_sections: list[tuple[str, list[tuple[int, str, Path]]]]) -> list[Path]:
+    return [path for _, section_entries in toc_sections for _, _, path in section_entries]
+
+
+def iter_toc_parts(
+    toc_sections: list[tuple[str, list[tuple[int, str, Path]]]],
+    multipage: bool = False,
+    per_recipe: bool = False,
+) -> Iterator[str]:
+    extras = f"sections/{EXTRAS_PAGE}" if multipage else ""
+    yield from [
         "## Table of Contents",
         "- [How to Use This Book](#how-to-use-this-book)",
     ]
 
     for section_title, section_entries in toc_sections:
-        lines.append(f"- [{section_title}](#{slugify(section_title)})")
+        section_slug = slugify(section_title)
+        section_page = f"sections/{section_slug}.html" if multipage else ""
+        yield f"- [{section_title}]({section_page or '#' + section_slug})"
         if section_entries:
-            for number, title in section_entries:
-                lines.append(f"  - [{number}) {title}](#{number}-{slugify(title)})")
+            for number, title, _ in section_entries:
+                anchor = f"{number}-{slugify(title)}"
+                href = f"recipes/{anchor}.html" if per_recipe else f"{section_page}#{anchor}"
+                yield f"  - [{number}) {title}]({href})"
         else:
-            lines.append("  - _Coming soon_")
+            yield "  - _Coming soon_"
 
-    lines.extend([
-        "- [Ready-to-Purchase Drop-Off Options](#ready-to-purchase-drop-off-options)",
-        "- [Homemade Meals That Travel Well (Simple)](#homemade-meals-that-travel-well-simple)",
-        "- [Helpful Delivery Notes](#helpful-delivery-notes)",
+    yield from [
+        f"- [Ready-to-Purchase Drop-Off Options]({extras}#ready-to-purchase-drop-off-options)",
+        f"- [Homemade Meals That Travel Well (Simple)]({extras}#homemade-meals-that-travel-well-simple)",
+        f"- [Helpful Delivery Notes]({extras}#helpful-delivery-notes)",
         "",
         "## How to Use This Book",
         "- Add or edit recipes in `recipes/`.",
@@ -244,39 +635,19 @@ def main() -> None:
         "- Run `python3 scripts/generate_recipe_book.py` to rebuild this book and website.",
         "",
         "---",
-    ])
-
-    for section_title, recipe_entries in section_recipes:
-        lines.extend([
-            "",
-            f"## {section_title}",
-        ])
-        if not recipe_entries:
-            lines.extend([
-                "",
-                "_Coming soon_",
-                "",
-                "---",
-            ])
-            continue
-        for number, title, body in recipe_entries:
-            lines.extend([
-                "",
-                f"### {number}) {title}",
-                body,
-                "",
-                "---",
-            ])
-
-    lines.extend([
+    ]
+
+
+def iter_extra_parts(cookbook: Cookbook) -> Iterator[str]:
+    yield from [
         "",
         "## Ready-to-Purchase Drop-Off Options",
-        read_doc_without_h1(DROP_OFF),
+        read_doc_without_h1(cookbook.drop_off),
         "",
         "---",
         "",
         "## Homemade Meals That Travel Well (Simple)",
-        read_doc_without_h1(TRANSPORT),
+        read_doc_without_h1(cookbook.transport),
         "",
         "---",
         "",
@@ -286,11 +657,330 @@ def main() -> None:
         "- Use disposable pans when possible to avoid return logistics.",
         "- Add a simple note of encouragement.",
         "- If appropriate, bring a complete meal: main dish, side, and simple dessert.",
-    ])
+    ]
+
+
+def iter_book_chunks(
+    toc_sections: list[tuple[str, list[tuple[int, str, Path]]]],
+    cookbook: Cookbook,
+    read: Callable[[Path], tuple[str, str]] | None = None,
+    stats: ReadStats | None = None,
+) -> Iterator[list[str]]:
+    # Every chunk ends with no list left open, so chunks render to HTML independently.
+    # Without a read callback, recipes stream from disk in TOC order through a bounded read-ahead window.
+    paths = toc_paths(toc_sections)
+    if read is None:
+        recipes = ((recipe.title, recipe.body) for recipe in stream_recipes(paths, stats or ReadStats()))
+    else:
+        recipes = map(read, paths)
+    yield [
+        f"# {cookbook.title}",
+        "",
+        "A collection of simple, comforting meals designed for sharing with neighbors and friends during times of need.",
+        "",
+        *iter_toc_parts(toc_sections),
+    ]
+
+    for section_title, section_entries in toc_sections:
+        if not section_entries:
+            yield ["", f"## {section_title}", "", "_Coming soon_", "", "---"]
+            continue
+        yield ["", f"## {section_title}"]
+        for number, _, _ in section_entries:
+            title, body = next(recipes)
+            yield ["", f"### {number}) {title}", body, "", "---"]
+
+    yield list(iter_extra_parts(cookbook))
+
+
+def iter_book_parts(
+    toc_sections: list[tuple[str, list[tuple[int, str, Path]]]],
+    cookbook: Cookbook,
+    read: Callable[[Path], tuple[str, str]] | None = None,
+    stats: ReadStats | None = None,
+) -> Iterator[str]:
+    for chunk in iter_book_chunks(toc_sections, cookbook, read, stats):
+        yield from chunk
+
+
+def render_chunk(parts: Iterable[str], started: bool) -> str:
+    buffer = io.StringIO()
+    renderer = MarkdownRenderer(buffer.write, started)
+    for line in split_parts(parts):
+        renderer.feed(line)
+    renderer.close_lists()
+    return buffer.getvalue()
+
+
+class IncrementalBook:
+    def __init__(self, cookbook: Cookbook | None = None) -> None:
+        self.cookbook = cookbook or default_cookbook()
+        self._sections: list[dict[str, list[Path] | str]] = []
+        self._recipes: dict[Path, tuple[str, str]] = {}
+        self._html: dict[tuple[bool, str], str] = {}
+        self.rendered = 0
+
+    def _load(self, path: Path) -> None:
+        try:
+            self._recipes[path] = read_recipe(path)
+        except FileNotFoundError:
+            self._recipes.pop(path, None)
+
+    def build(self, changed: Iterable[Path] | None = None) -> list[Path]:
+        cookbook = self.cookbook
+        if changed is None:
+            # These pages are written unminified; drop the hashed and compressed files an --optimize build left.
+            site_assets.remove_stale_assets(cookbook.docs, manifest_assets(load_manifest(cookbook.manifest)))
+        changed = None if changed is None else set(changed)
+        if changed is None or cookbook.index in changed:
+            self._sections = parse_index_sections(cookbook.index.read_text(encoding="utf-8"), cookbook.index.parent)
+        toc_sections: list[tuple[str, list[tuple[int, str, Path]]]] = []
+        counter = 1
+        for section in self._sections:
+            section_entries: list[tuple[int, str, Path]] = []
+            for path in section["paths"]:
+                if changed is None or path in changed or path not in self._recipes:
+                    self._load(path)
+                if path in self._recipes:
+                    section_entries.append((counter, self._recipes[path][0], path))
+                    counter += 1
+            toc_sections.append((str(section["title"]), section_entries))
+
+        markdown: list[str] = []
+        site: list[str] = [SITE_HEAD.replace("{title}", html.escape(cookbook.title), 1)]
+        cache: dict[tuple[bool, str], str] = {}
+        self.rendered = 0
+        for parts in iter_book_chunks(toc_sections, cookbook, self._recipes.__getitem__):
+            chunk = "\n".join(parts)
+            key = (bool(markdown), chunk)
+            html_chunk = self._html.get(key)
+            if html_chunk is None:
+                html_chunk = render_chunk(parts, started=bool(markdown))
+                self.rendered += 1
+            cache[key] = html_chunk
+            markdown.append(chunk)
+            site.append(html_chunk)
+        site.append(SITE_TAIL)
+        self._html = cache
+
+        written: list[Path] = []
+        outputs = ((cookbook.book, "\n".join(markdown) + "\n"), (cookbook.site, "".join(site)), (cookbook.nojekyll, "\n"))
+        for path, text in outputs:
+            if write_if_changed(path, text):
+                written.append(path)
+        return written
+
+
+def search_line(line: str) -> tuple[str, FoodItem | None]:
+    parsed = parse_ingredient_line(line)
+    if parsed is not None and parsed[2]:
+        # Nutrition has usually resolved this line already.
+        resolved = LINE_CACHE.resolve(line)
+        return parsed[2], resolved[0] if resolved is not None else None
+    # No quantity, or the food doubled as the unit ("- 1 egg"): search the whole line.
+    ingredient_text = line.strip()[2:].lower()
+    return ingredient_text, find_food(ingredient_text)
+
+
+def search_words(ingredient_text: str, food: FoodItem | None) -> set[str]:
+    if food is not None:
+        ingredient_text = f"{ingredient_text} {food.keywords[0]}"
+    return {word for word in WORD_RE.findall(ingredient_text) if word not in SEARCH_STOPWORDS}
+
+
+def search_entry(number: int, section_title: str, url: str, recipe: Recipe) -> dict[str, object]:
+    tokens: set[str] = set()
+    for line in recipe.ingredient_lines:
+        tokens.update(search_words(*search_line(line)))
+    m = MACROS_RE.match(recipe.macro_line or "")
+    return {
+        "number": number,
+        "title": recipe.title,
+        "slug": f"{number}-{slugify(recipe.title)}",
+        "section": section_title,
+        "url": url,
+        "ingredients": sorted(tokens),
+        "macros": [int(value) for value in m.groups()] if m else None,
+    }
+
+
+def split_parts(parts: Iterable[str]) -> Iterator[str]:
+    for part in parts:
+        yield from part.splitlines() or [""]
+
+
+def write_page(
+    path: Path,
+    parts: Iterable[str],
+    title: str,
+    before: str = "",
+    optimizer: site_assets.SiteOptimizer | None = None,
+) -> bool:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with OutputFile(path, optimizer and optimizer.page) as page:
+        render_site(page, split_parts(parts), title, before)
+    return page.changed
+
+
+def write_site_pages(
+    toc_sections: list[tuple[str, list[tuple[int, str, Path]]]],
+    cookbook: Cookbook,
+    per_recipe: bool,
+    stats: ReadStats | None = None,
+    optimizer: site_assets.SiteOptimizer | None = None,
+) -> tuple[list[Path], list[Path]]:
+    outputs: list[Path] = []
+    written: list[Path] = []
+    entries: list[dict[str, object]] = []
+    site_title = cookbook.title
+    # Section pages (or, with per_recipe, recipe pages) consume recipes in TOC order, once each.
+    recipes = stream_recipes(toc_paths(toc_sections), stats or ReadStats())
+
+    def page(path: Path, parts: Iterable[str], title: str, before: str = "") -> None:
+        outputs.append(path)
+        if write_page(path, parts, title, before, optimizer):
+            written.append(path)
+
+    for section_title, section_entries in toc_sections:
+        section_slug = slugify(section_title)
+
+        def section_lines() -> Iterator[str]:
+            yield from [f"# {section_title}", "", "[Back to all recipes](../index.html)"]
+            if not section_entries:
+                yield from ["", "_Coming soon_"]
+            for number, title, path in section_entries:
+                anchor = f"{number}-{slugify(title)}"
+                if per_recipe:
+                    yield f"- [{number}) {title}](../recipes/{anchor}.html)"
+                    continue
+                recipe = next(recipes)
+                entries.append(search_entry(number, section_title, f"sections/{section_slug}.html#{anchor}", recipe))
+                yield from ["", f"### {number}) {title}", recipe.body, "", "---"]
+
+        page(cookbook.section_pages / f"{section_slug}.html", section_lines(), f"{section_title} - {site_title}")
+
+        if not per_recipe:
+            continue
+        for number, title, path in section_entries:
+            anchor = f"{number}-{slugify(title)}"
+            recipe = next(recipes)
+            entries.append(search_entry(number, section_title, f"recipes/{anchor}.html", recipe))
+            lines = [f"# {number}) {title}", "", f"[Back to {section_title}](../sections/{section_slug}.html)", "", recipe.body]
+            page(cookbook.recipe_pages / f"{anchor}.html", lines, f"{title} - {site_title}")
+
+    extras = ["# Drop-Off and Delivery", "", "[Back to all recipes](../index.html)", *iter_extra_parts(cookbook)]
+    page(cookbook.section_pages / EXTRAS_PAGE, extras, f"Drop-Off and Delivery - {site_title}")
+
+    outputs.append(cookbook.search_index)
+    with OutputFile(cookbook.search_index) as search_index:
+        search_index.write(json.dumps({"recipes": entries}, ensure_ascii=False, separators=(",", ":")))
+        search_index.write("\n")
+    if search_index.changed:
+        written.append(cookbook.search_index)
+    if optimizer is not None:
+        optimizer.search_index(cookbook.search_index)
+
+    # Written last so an optimized landing page can point at the hashed search index.
+    landing = [
+        f"# {site_title}",
+        "",
+        "A collection of simple, comforting meals designed for sharing with neighbors and friends during times of need.",
+        "",
+        *iter_toc_parts(toc_sections, multipage=True, per_recipe=per_recipe),
+    ]
+    page(cookbook.site, landing, site_title, before=SEARCH_WIDGET)
+    return outputs, written
 
-    markdown_text = "\n".join(lines).rstrip() + "\n"
-    BOOK.write_text(markdown_text, encoding="utf-8")
-    write_site_html(markdown_text)
+
+def remove_stale_pages(cookbook: Cookbook, keep: Iterable[Path]) -> list[Path]:
+    keep = set(keep)
+    folders = (cookbook.section_pages, cookbook.recipe_pages)
+    stale = [path for folder in folders for path in folder.glob("*.html") if path not in keep]
+    if cookbook.search_index.exists() and cookbook.search_index not in keep:
+        stale.append(cookbook.search_index)
+    for path in stale:
+        path.unlink()
+    return stale
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild RECIPE_BOOK.md and the cookbook website.")
+    parser.add_argument("--force", action="store_true", help="rebuild even if no inputs changed")
+    parser.add_argument("--pages", action="store_true", help="write one page per section plus a search index")
+    parser.add_argument("--per-recipe", action="store_true", help="with --pages, also write one page per recipe")
+    parser.add_argument("--optimize", action="store_true", help="minify the site, hash CSS/JSON assets and precompress")
+    parser.add_argument("--read-threads", type=int, default=READ_THREADS, help="threads reading recipe files (1 = serial)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    with profiling.profiled(args, "book"):
+        build_book(
+            force=args.force,
+            pages=args.pages,
+            per_recipe=args.per_recipe,
+            optimize=args.optimize,
+            read_threads=args.read_threads,
+        )
+
+
+def build_book(
+    force: bool = False,
+    pages: bool = False,
+    per_recipe: bool = False,
+    optimize: bool = False,
+    read_threads: int = READ_THREADS,
+    cookbook: Cookbook | None = None,
+) -> None:
+    cookbook = cookbook or default_cookbook()
+    options = {
+        "pages": pages or per_recipe,
+        "per_recipe": per_recipe,
+        "optimize": optimize,
+        # Config settings that change the output without changing any input file.
+        "title": cookbook.title,
+        "index": display_path(cookbook.index),
+        "output": display_path(cookbook.output),
+        "extras": [display_path(cookbook.drop_off), display_path(cookbook.transport)],
+    }
+
+    start = time.perf_counter()
+    manifest = load_manifest(cookbook.manifest)
+    if not force and manifest_is_fresh(manifest, options):
+        print(f"Nothing to do: cookbook inputs unchanged ({(time.perf_counter() - start) * 1000:.1f} ms).")
+        return
+
+    idx = cookbook.index.read_text(encoding="utf-8")
+    sections = parse_index_sections(idx, cookbook.index.parent)
+    inputs = [*GENERATOR_FILES, cookbook.index, cookbook.drop_off, cookbook.transport]
+    inputs.extend(path for section in sections for path in section["paths"])
+    read_stats = ReadStats(threads=max(1, read_threads))
+    cookbook.docs.mkdir(parents=True, exist_ok=True)
+    optimizer = site_assets.SiteOptimizer(cookbook.docs) if optimize else None
+    toc_sections = build_toc(sections, read_stats)
+    parts = iter_book_parts(toc_sections, cookbook, stats=read_stats)
+    written = stream_book(parts, cookbook, not options["pages"], optimizer)
+    outputs = [cookbook.book, cookbook.site, cookbook.nojekyll]
+    if options["pages"]:
+        page_outputs, page_written = write_site_pages(
+            toc_sections, cookbook, options["per_recipe"], read_stats, optimizer
+        )
+        outputs = [cookbook.book, cookbook.nojekyll, *page_outputs]
+        written.extend(page_written)
+        if write_if_changed(cookbook.nojekyll, "\n"):
+            written.append(cookbook.nojekyll)
+    removed = remove_stale_pages(cookbook, outputs)
+    assets = optimizer.assets if optimizer is not None else []
+    site_assets.remove_stale_assets(cookbook.docs, manifest_assets(manifest), assets)
+    save_manifest(cookbook.manifest, inputs, outputs, options, assets)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    names = ", ".join(display_path(path) for path in written) or "no files changed"
+    print(f"Rebuilt cookbook in {elapsed_ms:.1f} ms: {names}.")
+    print(read_stats.summary())
+    if removed:
+        print(f"Removed {len(removed)} stale page(s).")
+    if optimizer is not None:
+        print("Optimized site output (bytes):")
+        site_assets.print_report(optimizer.report, ROOT)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Iterator
+
+import auto_nutrition
+from generate_recipe_book import slugify
+from recipe_model import parse_recipe, splice_macro_line
+
+ROOT = Path(__file__).resolve().parents[1]
+INDEX = ROOT / "RECIPE_INDEX.md"
+DEFAULT_SECTION = "Freezer Meals"
+NO_RESPONSE = "_No response_"
+FORM_FIELDS = {
+    "recipe title": "title",
+    "recipe owner": "owner",
+    "serves / yield": "serves",
+    "ingredients": "ingredients",
+    "instructions": "instructions",
+    "transport notes": "transport",
+    "section": "section",
+}
+INDEX_LINK_RE = re.compile(r"\((recipes/[^)]+\.md)\)")
+STEP_NUMBER_RE = re.compile(r"\d+[.)]\s*")
+SECTION_LABEL = "section:"
+
+
+def parse_issue_body(body: str) -> dict[str, str]:
+    fields: dict[str, str] = {}
+    current: str | None = None
+    lines: list[str] = []
+
+    def flush() -> None:
+        value = "\n".join(lines).strip()
+        if current is not None and value and value != NO_RESPONSE:
+            fields[current] = value
+
+    for line in body.splitlines():
+        if line.startswith("### "):
+            flush()
+            current = FORM_FIELDS.get(line[4:].strip().lower())
+            lines = []
+        elif current is not None:
+            lines.append(line)
+    flush()
+    return fields
+
+
+def submission_fields(payload: object) -> dict[str, str]:
+    if not isinstance(payload, dict):
+        raise ValueError("not a JSON object")
+    fields = parse_issue_body(payload["body"]) if isinstance(payload.get("body"), str) else {}
+    for key in FORM_FIELDS.values():
+        value = payload.get(key)
+        if isinstance(value, str) and value.strip() and key not in fields:
+            fields[key] = value.strip()
+    for label in payload.get("labels") or []:
+        name = label.get("name") if isinstance(label, dict) else label
+        if isinstance(name, str) and name.lower().startswith(SECTION_LABEL) and "section" not in fields:
+            fields["section"] = name[len(SECTION_LABEL):].strip()
+    return fields
+
+
+def bullet_lines(text: str) -> list[str]:
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(("- ", "* ")):
+            line = line[2:].strip()
+        lines.append(f"- {line}")
+    return lines
+
+
+def numbered_lines(text: str) -> list[str]:
+    steps = [STEP_NUMBER_RE.sub("", line.strip(), count=1) for line in text.splitlines() if line.strip()]
+    return [f"{number}. {step}" for number, step in enumerate(steps, 1)]
+
+
+def recipe_markdown(fields: dict[str, str]) -> str:
+    title = " ".join(fields.get("title", "").lstrip("#").split())
+    if not title or not slugify(title):
+        raise ValueError("missing recipe title")
+    ingredients = bullet_lines(fields.get("ingredients", ""))
+    if not ingredients:
+        raise ValueError("missing ingredients")
+    instructions = numbered_lines(fields.get("instructions", ""))
+    if not instructions:
+        raise ValueError("missing instructions")
+
+    lines = [
+        f"# {title}",
+        "",
+        f"**Recipe Owner:** {' '.join(fields.get('owner', '').split())}".rstrip(),
+        f"**Serves/Yield:** {' '.join(fields.get('serves', '').split())}".rstrip(),
+        "**Prep time:**",
+        "**Cook time:**",
+        "**Estimated macros (auto):** pending",
+        "",
+        "### Ingredients",
+        *ingredients,
+        "",
+        "### Instructions",
+        *instructions,
+    ]
+    transport = bullet_lines(fields.get("transport", ""))
+    if transport:
+        lines.extend(["", "### Transport Notes", *transport])
+    return "\n".join(lines) + "\n"
+
+
+def with_macros(text: str) -> tuple[str, str]:
+    recipe = parse_recipe(text)
+    macro_line = auto_nutrition.estimate_macro_line(recipe)
+    pieces = splice_macro_line(recipe, macro_line)
+    return ("".join(pieces) if pieces is not None else text), macro_line
+
+
+def section_folders(index_path: Path) -> dict[str, str]:
+    folders: dict[str, str] = {}
+    section: str | None = None
+    with index_path.open(encoding="utf-8") as fh:
+        for line in fh:
+            if line.startswith("## "):
+                section = line[3:].strip()
+                continue
+            m = INDEX_LINK_RE.search(line)
+            if m and section is not None and section not in folders:
+                folders[section] = Path(m.group(1)).parent.as_posix()
+    return folders
+
+
+def read_submissions(source: IO[str]) -> Iterator[tuple[int, object]]:
+    for number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, exc
+
+
+def rewrite_index(index_path: Path, spools: dict[str, IO[str]]) -> None:
+    def copy_spool(section: str | None) -> None:
+        spool = spools.pop(section, None) if section is not None else None
+        if spool is not None:
+            spool.seek(0)
+            for entry in spool:
+                out.write(entry)
+
+    tmp = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+    with index_path.open(encoding="utf-8") as src, tmp.open("w", encoding="utf-8") as out:
+        section: str | None = None
+        blanks: list[str] = []
+        for line in src:
+            if not line.endswith("\n"):
+                line += "\n"
+            if not line.strip():
+                blanks.append(line)
+                continue
+            if line.startswith("## "):
+                copy_spool(section)
+                section = line[3:].strip()
+            out.writelines(blanks)
+            blanks = []
+            out.write(line)
+        copy_spool(section)
+        for title in list(spools):
+            out.write(f"\n## {title}\n")
+            copy_spool(title)
+        out.writelines(blanks)
+    os.replace(tmp, index_path)
+
+
+def import_submissions(
+    source: IO[str],
+    default_section: str = DEFAULT_SECTION,
+    use_cache: bool = True,
+    cache_path: Path = auto_nutrition.CACHE_PATH,
+) -> tuple[int, int]:
+    cache = None
+    if use_cache:
+        cache = auto_nutrition.NutritionCache(cache_path)
+        cache.load()
+        auto_nutrition.LINE_CACHE.restore(cache.lines)
+        # Keep the existing entries; this run only adds new recipes.
+        cache.seen.update(cache.entries)
+
+    folders = section_folders(INDEX)
+    spools: dict[str, IO[str]] = {}
+    imported = rejected = 0
+    try:
+        for number, payload in read_submissions(source):
+            try:
+                if isinstance(payload, Exception):
+                    raise ValueError(f"invalid JSON ({payload})")
+                fields = submission_fields(payload)
+                text, macro_line = with_macros(recipe_markdown(fields))
+                section = " ".join(fields.get("section", default_section).split()) or default_section
+                folder = folders.setdefault(section, f"recipes/{slugify(section)}")
+                title = parse_recipe(text).title
+                rel = f"{folder}/{slugify(title)}.md"
+                path = ROOT / rel
+                path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    with path.open("x", encoding="utf-8") as fh:
+                        fh.write(text)
+                except FileExistsError:
+                    raise ValueError(f"{rel} already exists") from None
+            except ValueError as exc:
+                rejected += 1
+                print(f"line {number}: skipped, {exc}", file=sys.stderr)
+                continue
+
+            if section not in spools:
+                spools[section] = tempfile.TemporaryFile("w+", encoding="utf-8")
+            spools[section].write(f"- [{title}]({rel})\n")
+            if cache is not None:
+                cache.put(auto_nutrition.content_digest(text), macro_line)
+            imported += 1
+            print(f"{rel}: {macro_line}")
+
+        if imported:
+            rewrite_index(INDEX, spools)
+    finally:
+        for spool in spools.values():
+            spool.close()
+    if cache is not None:
+        cache.save(auto_nutrition.LINE_CACHE)
+    return imported, rejected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import recipe submissions (one issue payload per line) into recipes/.")
+    parser.add_argument("submissions", help="JSONL file of submissions, or - for stdin")
+    parser.add_argument("--section", default=DEFAULT_SECTION, help="index section for submissions without one")
+    parser.add_argument("--no-cache", action="store_true", help="don't read or update the nutrition cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.submissions == "-":
+        imported, rejected = import_submissions(sys.stdin, args.section, not args.no_cache)
+    else:
+        with open(args.submissions, encoding="utf-8") as source:
+            imported, rejected = import_submissions(source, args.section, not args.no_cache)
+    elapsed = time.perf_counter() - start
+    total = imported + rejected
+    print(
+        f"\nImported {imported} recipe(s), skipped {rejected} in {elapsed:.2f} s "
+        f"({total / elapsed if elapsed else 0:.0f} submissions/s)."
+    )
+
+
+if __name__ == "__main__":
+    main()
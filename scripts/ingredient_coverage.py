@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from auto_nutrition import FOOD_MATCHER, RECIPE_GLOB, WORD_RE, parse_ingredient_line
+from recipe_model import CACHE_DIR as RECIPE_CACHE_DIR, RecipeStore
+
+ROOT = Path(__file__).resolve().parents[1]
+NO_QUANTITY = "no quantity"
+UNKNOWN_FOOD = "unknown food"
+READ_AS_UNIT = "food read as the unit"
+
+
+@dataclass
+class Unmatched:
+    reason: str
+    count: int = 0
+    recipes: set[str] = field(default_factory=set)
+
+
+@dataclass
+class Coverage:
+    recipes: int = 0
+    lines: int = 0
+    exact: int = 0
+    fuzzy: int = 0
+    unmatched: dict[str, Unmatched] = field(default_factory=dict)
+    corrections: Counter[tuple[str, str]] = field(default_factory=Counter)
+
+    def add_line(self, line: str, rel: str) -> None:
+        self.lines += 1
+        parsed = parse_ingredient_line(line)
+        if parsed is None:
+            self._miss(line.strip()[2:].lower(), NO_QUANTITY, rel)
+            return
+        text = parsed[2]
+        if not text:
+            # "- 1 egg": the parser takes the food for the unit and leaves nothing to match.
+            self._miss(line.strip()[2:].lower(), READ_AS_UNIT, rel)
+            return
+        if FOOD_MATCHER.find(text, fuzzy=False) is not None:
+            self.exact += 1
+        elif FOOD_MATCHER.find(text) is not None:
+            self.fuzzy += 1
+            self.corrections.update(FOOD_MATCHER.corrections(text))
+        else:
+            self._miss(text, UNKNOWN_FOOD, rel)
+
+    def _miss(self, text: str, reason: str, rel: str) -> None:
+        # Lines without letters ("- 2") are still listed, so the report adds up to the unmatched count.
+        key = " ".join(WORD_RE.findall(text)) or text.strip()
+        entry = self.unmatched.get(key)
+        if entry is None:
+            entry = self.unmatched[key] = Unmatched(reason)
+        entry.count += 1
+        entry.recipes.add(rel)
+
+    def top(self, limit: int) -> list[tuple[str, Unmatched]]:
+        ranked = sorted(self.unmatched.items(), key=lambda item: (-item[1].count, item[0]))
+        return ranked[:limit] if limit > 0 else ranked
+
+
+def scan(store: RecipeStore) -> Coverage:
+    coverage = Coverage()
+    for path in sorted(ROOT.glob(RECIPE_GLOB)):
+        rel = path.relative_to(ROOT).as_posix()
+        coverage.recipes += 1
+        for line in store.load(path).ingredient_lines:
+            coverage.add_line(line, rel)
+    return coverage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="List the ingredients the nutrition table most often fails to match.")
+    parser.add_argument("--top", type=int, default=25, help="show this many unmatched ingredients (0 = all)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the recipe parse cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    coverage = scan(RecipeStore(None if args.no_cache else RECIPE_CACHE_DIR))
+    elapsed = time.perf_counter() - start
+    top = coverage.top(args.top)
+
+    if args.json:
+        print(json.dumps({
+            "recipes": coverage.recipes,
+            "lines": coverage.lines,
+            "exact": coverage.exact,
+            "fuzzy": coverage.fuzzy,
+            "unmatched": [
+                {"ingredient": text, "reason": entry.reason, "count": entry.count, "recipes": sorted(entry.recipes)}
+                for text, entry in top
+            ],
+            "corrections": [
+                {"from": typo, "to": word, "count": count} for (typo, word), count in coverage.corrections.most_common()
+            ],
+        }, indent=1))
+        return
+
+    missed = coverage.lines - coverage.exact - coverage.fuzzy
+    share = (coverage.exact + coverage.fuzzy) / coverage.lines * 100 if coverage.lines else 0.0
+    print(
+        f"{coverage.recipes} recipe(s), {coverage.lines} ingredient line(s): {coverage.exact} matched, "
+        f"{coverage.fuzzy} matched after spelling fixes, {missed} unmatched ({share:.1f}% coverage) in {elapsed:.2f} s."
+    )
+    if top:
+        print(f"\nMost frequent unmatched ingredients ({len(top)} of {len(coverage.unmatched)}):")
+        print(f"  {'count':>6} {'recipes':>8}  ingredient")
+        for text, entry in top:
+            example = min(entry.recipes)
+            note = f" [{entry.reason}]" if entry.reason != UNKNOWN_FOOD else ""
+            print(f"  {entry.count:>6} {len(entry.recipes):>8}  {text}{note}  (e.g. {example})")
+    if coverage.corrections:
+        print("\nSpelling fixes applied (consider adding these as keywords):")
+        for (typo, word), count in coverage.corrections.most_common(args.top if args.top > 0 else None):
+            print(f"  {count:>6}  {typo} -> {word}")
+
+
+if __name__ == "__main__":
+    main()
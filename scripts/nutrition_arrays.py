@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from auto_nutrition import (
+    FOODS,
+    FoodItem,
+    find_food,
+    ingredient_to_grams,
+    macro_line_for_totals,
+    parse_ingredient_line,
+    servings_value,
+)
+from recipe_model import Recipe
+
+UNITS = ("lb", "oz", "can", "jar", "pkg", "cup", "tbsp", "tsp", "unit")
+
+# (recipe position, food row, unit column, quantity) for every matched ingredient line.
+Resolved = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def food_arrays(foods: Sequence[FoodItem]) -> tuple[np.ndarray, np.ndarray]:
+    nutrients = np.array(
+        [[food.cal_per_100g, food.protein_per_100g, food.fat_per_100g, food.carbs_per_100g] for food in foods],
+        dtype=np.float64,
+    ).reshape(len(foods), 4)
+    grams_per_unit = np.array(
+        [[ingredient_to_grams(1.0, unit, food) for unit in UNITS] for food in foods],
+        dtype=np.float64,
+    ).reshape(len(foods), len(UNITS))
+    return nutrients, grams_per_unit
+
+
+class FoodTable:
+    def __init__(self, foods: Sequence[FoodItem] = FOODS) -> None:
+        self.foods = tuple(foods)
+        self.rows = {food: row for row, food in enumerate(self.foods)}
+        self.columns = {unit: col for col, unit in enumerate(UNITS)}
+        self.nutrients, self.grams_per_unit = food_arrays(self.foods)
+
+    def extend(self, foods: Sequence[FoodItem]) -> None:
+        # Foods matched from the external database get rows as they turn up.
+        nutrients, grams_per_unit = food_arrays(foods)
+        self.nutrients = np.concatenate([self.nutrients, nutrients])
+        self.grams_per_unit = np.concatenate([self.grams_per_unit, grams_per_unit])
+        self.foods += tuple(foods)
+
+    def resolve(self, recipes: Sequence[Recipe]) -> Resolved:
+        owners: list[int] = []
+        rows: list[int] = []
+        columns: list[int] = []
+        quantities: list[float] = []
+        extra: list[FoodItem] = []
+        for owner, recipe in enumerate(recipes):
+            for line in recipe.ingredient_lines:
+                parsed = parse_ingredient_line(line)
+                if parsed is None:
+                    continue
+                qty, unit, ingredient_text = parsed
+                food = find_food(ingredient_text)
+                if food is None:
+                    continue
+                row = self.rows.get(food)
+                if row is None:
+                    row = self.rows[food] = len(self.foods) + len(extra)
+                    extra.append(food)
+                owners.append(owner)
+                rows.append(row)
+                columns.append(self.columns[unit])
+                quantities.append(qty)
+        if extra:
+            self.extend(extra)
+        return (
+            np.array(owners, dtype=np.intp),
+            np.array(rows, dtype=np.intp),
+            np.array(columns, dtype=np.intp),
+            np.array(quantities, dtype=np.float64),
+        )
+
+    def totals(self, resolved: Resolved, count: int) -> tuple[np.ndarray, np.ndarray]:
+        owners, rows, columns, quantities = resolved
+        factors = quantities * self.grams_per_unit[rows, columns] / 100.0
+        contributions = self.nutrients[rows] * factors[:, None]
+        totals = np.column_stack(
+            [np.bincount(owners, weights=contributions[:, col], minlength=count) for col in range(4)]
+        ).reshape(count, 4)
+        matched = np.bincount(owners, minlength=count)
+        return totals, matched
+
+    def macro_lines(self, recipes: Sequence[Recipe], resolved: Resolved | None = None) -> list[str]:
+        if resolved is None:
+            resolved = self.resolve(recipes)
+        totals, matched = self.totals(resolved, len(recipes))
+        lines: list[str] = []
+        for recipe, (cal, protein, fat, carbs), hits in zip(recipes, totals.tolist(), matched.tolist()):
+            ingredient_count = len(recipe.ingredient_lines)
+            coverage = (hits / ingredient_count) if ingredient_count else 0.0
+            servings = servings_value(recipe.field("serves/yield"))
+            lines.append(macro_line_for_totals(cal, protein, fat, carbs, servings, coverage))
+        return lines
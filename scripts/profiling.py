@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+PROJECT_PREFIX = str(ROOT) + os.sep
+PROFILE_DIR = ROOT / ".cache"
+MAX_TRACE_EVENTS = 200_000
+# (module, attribute, stage). Functions are swapped for timed wrappers only while profiling.
+STAGES = (
+    ("auto_nutrition", "run_nutrition", "nutrition (total)"),
+    ("generate_recipe_book", "build_book", "book (total)"),
+    ("recipe_model", "RecipeStore.read", "file read"),
+    ("recipe_model", "parse_recipe", "ingredient extraction"),
+    ("auto_nutrition", "parse_ingredient_line", "ingredient parsing"),
+    ("auto_nutrition", "find_food", "food lookup"),
+    ("auto_nutrition", "format_macro_line", "macro formatting"),
+    ("auto_nutrition", "write_text_atomic", "file write"),
+    ("generate_recipe_book", "parse_index_sections", "index parsing"),
+    ("generate_recipe_book", "MarkdownRenderer.feed", "markdown rendering"),
+    ("generate_recipe_book", "OutputFile.write", "output write"),
+    ("generate_recipe_book", "OutputFile.__exit__", "output write"),
+)
+
+
+def project_modules(name: str | None = None) -> list[ModuleType]:
+    found = []
+    for key, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if not path or not os.path.abspath(path).startswith(PROJECT_PREFIX):
+            continue
+        # Scripts run directly are __main__, not their module name.
+        if name is None or key == name or (key == "__main__" and Path(path).stem == name):
+            found.append(module)
+    return found
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.stop: float | None = None
+        # stage -> [calls, total seconds, self seconds]
+        self.stats: dict[str, list[float]] = {}
+        self.events: list[tuple[str, float, float, int | None]] = []
+        self.dropped = 0
+        # Book reads run on a thread pool, so nesting is tracked per thread.
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._patches: list[tuple[object, str, object]] = []
+
+    def wrap(self, stage: str, fn: Callable[..., object]) -> Callable[..., object]:
+        perf = time.perf_counter
+        local = self._local
+        lock = self._lock
+        events = self.events
+        record = self.stats.setdefault(stage, [0, 0.0, 0.0])
+
+        @functools.wraps(fn)
+        def timed(*args: object, **kwargs: object) -> object:
+            children = getattr(local, "children", None)
+            if children is None:
+                children = local.children = []
+            children.append(0.0)
+            begin = perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf() - begin
+                child = children.pop()
+                if children:
+                    children[-1] += elapsed
+                with lock:
+                    record[0] += 1
+                    record[1] += elapsed
+                    record[2] += elapsed - child
+                    if len(events) < MAX_TRACE_EVENTS:
+                        events.append((stage, begin, elapsed, threading.get_ident()))
+                    else:
+                        self.dropped += 1
+
+        return timed
+
+    def _patch(self, owner: object, attr: str, value: object) -> None:
+        self._patches.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, value)
+
+    def instrument(self, module: ModuleType, attr: str, stage: str) -> None:
+        owner: object = module
+        *parents, name = attr.split(".")
+        for parent in parents:
+            owner = getattr(owner, parent)
+        original = getattr(owner, name)
+        wrapped = self.wrap(stage, original)
+        self._patch(owner, name, wrapped)
+        if parents:
+            return
+        # `from module import fn` copies the reference; patch those too.
+        for other in project_modules():
+            if other is not module and getattr(other, name, None) is original:
+                self._patch(other, name, wrapped)
+
+    def enable(self) -> None:
+        for module_name, attr, stage in STAGES:
+            for module in project_modules(module_name):
+                self.instrument(module, attr, stage)
+        self.start = time.perf_counter()
+
+    def disable(self) -> None:
+        self.stop = time.perf_counter()
+        while self._patches:
+            owner, attr, original = self._patches.pop()
+            setattr(owner, attr, original)
+
+    def wall(self) -> float:
+        return (self.stop or time.perf_counter()) - self.start
+
+    def report(self) -> None:
+        wall = self.wall()
+        print(f"\nProfile ({wall * 1000:.1f} ms wall):")
+        print(f"  {'stage':<24}{'calls':>10}{'total ms':>12}{'self ms':>12}{'% wall':>9}")
+        for stage, (calls, total, own) in self.stats.items():
+            if calls:
+                share = own / wall * 100 if wall else 0.0
+                print(f"  {stage:<24}{calls:>10}{total * 1000:>12.1f}{own * 1000:>12.1f}{share:>8.1f}%")
+
+    def trace(self) -> dict[str, object]:
+        pid = os.getpid()
+        threads = {threading.main_thread().ident: 0}
+        events = [
+            {
+                "name": stage,
+                "ph": "X",
+                "ts": round((begin - self.start) * 1e6, 3),
+                "dur": round(elapsed * 1e6, 3),
+                "pid": pid,
+                "tid": threads.setdefault(thread, len(threads)),
+            }
+            for stage, begin, elapsed, thread in self.events
+        ]
+        stages = {
+            stage: {"calls": calls, "total_ms": round(total * 1000, 3), "self_ms": round(own * 1000, 3)}
+            for stage, (calls, total, own) in self.stats.items()
+        }
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "wall_ms": round(self.wall() * 1000, 3),
+            "stages": stages,
+            "dropped_events": self.dropped,
+        }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", action="store_true", help="print per-stage timings and write a Chrome trace")
+    group.add_argument("--profile-output", type=Path, help="trace file (default: .cache/profile-<script>.json)")
+    group.add_argument("--cprofile", type=int, default=0, metavar="N", help="also run under cProfile and list the top N functions")
+
+
+@contextmanager
+def profiled(args: argparse.Namespace, name: str) -> Iterator[None]:
+    if not (args.profile or args.cprofile):
+        yield
+        return
+
+    profiler = Profiler()
+    profiler.enable()
+    hot = cProfile.Profile() if args.cprofile else None
+    if hot is not None:
+        hot.enable()
+    try:
+        yield
+    finally:
+        if hot is not None:
+            hot.disable()
+        profiler.disable()
+        profiler.report()
+        output = args.profile_output or PROFILE_DIR / f"profile-{name}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(profiler.trace()) + "\n", encoding="utf-8")
+        print(f"Trace written to {output} (open in chrome://tracing or ui.perfetto.dev).")
+        if hot is not None:
+            print(f"\nTop {args.cprofile} functions by cumulative time:")
+            pstats.Stats(hot, stream=sys.stdout).sort_stats("cumulative").print_stats(args.cprofile)
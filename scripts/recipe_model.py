@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / ".cache" / "recipes"
+PARSER_VERSION = 2
+FIELD_RE = re.compile(r"\*\*([^*\n]+?):\*\*[ \t]*(.*)")
+MACRO_PREFIX = "**Estimated macros (auto):**"
+INGREDIENTS_HEADING = "### Ingredients"
+COOK_TIME_PREFIX = "**Cook time:**"
+LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+class Recipe:
+    __slots__ = (
+        "path",
+        "text",
+        "title",
+        "body",
+        "fields",
+        "ingredient_lines",
+        "sections",
+        "macro_line",
+        "macro_spans",
+        "macro_anchor",
+        "stamp",
+    )
+
+    def __init__(
+        self,
+        path: Path | None,
+        text: str,
+        title: str | None,
+        body: str,
+        fields: dict[str, str],
+        ingredient_lines: list[str],
+        sections: list[tuple[str, list[str]]],
+        macro_line: str | None,
+        macro_spans: list[tuple[int, int]] | None = None,
+        macro_anchor: int = 0,
+        stamp: tuple[int, int] | None = None,
+    ) -> None:
+        self.path = path
+        self.text = text
+        self.title = title
+        self.body = body
+        self.fields = fields
+        self.ingredient_lines = ingredient_lines
+        self.sections = sections
+        self.macro_line = macro_line
+        # Character offsets of every macro line, and where a missing one would be inserted.
+        self.macro_spans = macro_spans if macro_spans is not None else []
+        self.macro_anchor = macro_anchor
+        self.stamp = stamp
+
+    def field(self, name: str) -> str | None:
+        return self.fields.get(name.lower())
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "version": PARSER_VERSION,
+            "path": str(self.path),
+            "stamp": list(self.stamp) if self.stamp is not None else None,
+            "text": self.text,
+            "title": self.title,
+            "body": self.body,
+            "fields": self.fields,
+            "ingredient_lines": self.ingredient_lines,
+            "sections": [[heading, lines] for heading, lines in self.sections],
+            "macro_line": self.macro_line,
+            "macro_spans": [list(span) for span in self.macro_spans],
+            "macro_anchor": self.macro_anchor,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> Recipe:
+        stamp = data["stamp"]
+        return cls(
+            path=Path(str(data["path"])),
+            text=str(data["text"]),
+            title=data["title"],
+            body=str(data["body"]),
+            fields=dict(data["fields"]),
+            ingredient_lines=list(data["ingredient_lines"]),
+            sections=[(heading, list(lines)) for heading, lines in data["sections"]],
+            macro_line=data["macro_line"],
+            macro_spans=[(int(start), int(end)) for start, end in data["macro_spans"]],
+            macro_anchor=int(data["macro_anchor"]),
+            stamp=(int(stamp[0]), int(stamp[1])) if stamp else None,
+        )
+
+
+def parse_recipe(text: str, path: Path | None = None) -> Recipe:
+    fields: dict[str, str] = {}
+    sections: list[tuple[str, list[str]]] = []
+    ingredient_lines: list[str] = []
+    macro_line: str | None = None
+    macro_spans: list[tuple[int, int]] = []
+    first_line_end: int | None = None
+    cook_time_end: int | None = None
+    offset = 0
+    section_lines: list[str] | None = None
+    # 0 = before the ingredients heading, 1 = inside the block, 2 = past it.
+    ingredients_state = 0
+
+    for raw_line in text.splitlines(keepends=True):
+        line = raw_line.rstrip(LINE_BREAKS)
+        start = offset
+        offset += len(raw_line)
+        if first_line_end is None:
+            first_line_end = start + len(line)
+
+        if line.startswith("### "):
+            section_lines = []
+            sections.append((line[4:].strip(), section_lines))
+            if ingredients_state == 1:
+                ingredients_state = 2
+        elif section_lines is not None:
+            section_lines.append(line)
+
+        if ingredients_state == 1 and line.strip().startswith("- "):
+            ingredient_lines.append(line.rstrip())
+        elif ingredients_state == 0 and line.endswith(INGREDIENTS_HEADING):
+            ingredients_state = 1
+
+        if line.startswith(MACRO_PREFIX):
+            macro_spans.append((start, start + len(line)))
+            if macro_line is None:
+                macro_line = line
+        elif cook_time_end is None and line.startswith(COOK_TIME_PREFIX):
+            cook_time_end = start + len(line)
+        m = FIELD_RE.match(line)
+        if m:
+            fields.setdefault(m.group(1).strip().lower(), m.group(2).strip())
+
+    stripped = text.strip()
+    title_line, _, rest = stripped.partition("\n")
+    title: str | None = None
+    body = stripped
+    if title_line.startswith("# "):
+        title = title_line[2:].strip()
+        body = rest.strip()
+
+    anchor = cook_time_end if cook_time_end is not None else (first_line_end or 0)
+    return Recipe(path, text, title, body, fields, ingredient_lines, sections, macro_line, macro_spans, anchor)
+
+
+def splice_macro_line(recipe: Recipe, new_line: str) -> list[str] | None:
+    text = recipe.text
+    if recipe.macro_spans:
+        if all(text[start:end] == new_line for start, end in recipe.macro_spans):
+            return None
+        pieces: list[str] = []
+        position = 0
+        for start, end in recipe.macro_spans:
+            pieces.extend((text[position:start], new_line))
+            position = end
+        pieces.append(text[position:])
+        return pieces
+    if not text:
+        return [new_line]
+    anchor = recipe.macro_anchor
+    return [text[:anchor], "\n", new_line, text[anchor:]]
+
+
+class RecipeStore:
+    def __init__(self, cache_dir: Path | None = CACHE_DIR, keep: bool = False) -> None:
+        self.cache_dir = cache_dir
+        self.keep = keep
+        self.reads = 0
+        self.cache_hits = 0
+        self._recipes: dict[Path, Recipe] = {}
+
+    def _cache_file(self, path: Path) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:24]
+        return self.cache_dir / f"{key}.json"
+
+    def _load_cached(self, path: Path, stamp: tuple[int, int]) -> Recipe | None:
+        cache_file = self._cache_file(path)
+        if cache_file is None:
+            return None
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != PARSER_VERSION or data.get("path") != str(path) or data.get("stamp") != list(stamp):
+            return None
+        return Recipe.from_dict(data)
+
+    def _save_cached(self, recipe: Recipe) -> None:
+        cache_file = self._cache_file(recipe.path)
+        if cache_file is None:
+            return
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(recipe.to_dict()), encoding="utf-8")
+        tmp.replace(cache_file)
+
+    def prune(self, paths: Iterable[Path]) -> int:
+        # After a full run, drop entries for recipes that were renamed, deleted or parsed from another tree.
+        if self.cache_dir is None or not self.cache_dir.is_dir():
+            return 0
+        keep = {self._cache_file(path).name for path in paths}
+        removed = 0
+        for cache_file in self.cache_dir.glob("*.json"):
+            if cache_file.name not in keep:
+                cache_file.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def _remember(self, recipe: Recipe) -> Recipe:
+        if self.keep:
+            self._recipes[recipe.path] = recipe
+        return recipe
+
+    def load(self, path: Path) -> Recipe:
+        found = self.read(path)
+        if isinstance(found, Recipe):
+            return found
+        return self.parse(path, *found)
+
+    def read(self, path: Path) -> Recipe | tuple[str, tuple[int, int]]:
+        # The I/O half of load(): a known recipe, or the file text still to be parsed.
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        recipe = self._recipes.get(path)
+        if recipe is not None and recipe.stamp == stamp:
+            return recipe
+
+        recipe = self._load_cached(path, stamp)
+        if recipe is not None:
+            self.cache_hits += 1
+            return self._remember(recipe)
+        return path.read_text(encoding="utf-8"), stamp
+
+    def parse(self, path: Path, text: str, stamp: tuple[int, int]) -> Recipe:
+        recipe = parse_recipe(text, path)
+        recipe.stamp = stamp
+        self.reads += 1
+        self._save_cached(recipe)
+        return self._remember(recipe)
+
+    def store(self, path: Path, text: str) -> Recipe:
+        st = path.stat()
+        recipe = parse_recipe(text, path)
+        recipe.stamp = (st.st_mtime_ns, st.st_size)
+        self._save_cached(recipe)
+        return self._remember(recipe)
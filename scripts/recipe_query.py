@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import generate_recipe_book
+from auto_nutrition import RECIPE_GLOB, FoodItem, find_food, tables_digest
+from generate_recipe_book import MACROS_RE, SEARCH_STOPWORDS, parse_index_sections, search_line, search_words
+from recipe_model import RecipeStore
+
+ROOT = Path(__file__).resolve().parents[1]
+INDEX_PATH = ROOT / ".cache" / "query-index.json"
+INDEX_VERSION = 3
+NUMERIC_FIELDS = ("cal", "protein", "fat", "carbs", "prep", "cook")
+# Allergen groups are listed by each FoodItem's first keyword.
+ALLERGENS: dict[str, tuple[str, ...]] = {
+    "dairy": (
+        "cream of chicken soup", "cream of mushroom soup", "sour cream", "ricotta", "cream cheese", "cottage cheese",
+        "cheddar cheese", "mozzarella", "parmesan", "monterey jack", "milk", "heavy cream", "butter",
+    ),
+    "gluten": (
+        "egg noodles", "ziti pasta", "flour", "breadcrumbs", "tortilla", "cream of chicken soup",
+        "cream of mushroom soup",
+    ),
+    "egg": ("egg", "egg noodles"),
+    "meat": ("cooked chicken", "ground turkey", "ground beef", "pulled pork", "chicken broth", "beef broth"),
+}
+# Ingredient words (singular; plurals match too) that put a recipe in a group even when no food matched the line.
+# Erring towards exclusion is deliberate: "peanut butter" is dropped by "no dairy" rather than risk a missed allergen.
+ALLERGEN_WORDS: dict[str, tuple[str, ...]] = {
+    "dairy": (
+        "milk", "cream", "cheese", "butter", "buttermilk", "yogurt", "yoghurt", "ghee", "whey", "kefir", "custard",
+        "ricotta", "mozzarella", "parmesan", "cheddar", "feta", "queso", "paneer", "half and half",
+    ),
+    "gluten": (
+        "wheat", "flour", "bread", "breadcrumb", "crumb", "panko", "pasta", "noodle", "ziti", "penne", "spaghetti",
+        "macaroni", "lasagna", "couscous", "barley", "rye", "cracker", "biscuit", "tortilla", "soy sauce",
+    ),
+    "egg": ("egg", "mayonnaise", "mayo", "meringue"),
+    "meat": (
+        "chicken", "beef", "pork", "turkey", "ham", "bacon", "sausage", "lamb", "veal", "venison", "pepperoni",
+        "salami", "prosciutto", "chorizo", "meatball",
+    ),
+}
+HOURS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hour|hours)\b")
+MINUTES_RE = re.compile(r"(\d+)\s*(?:m|min|mins|minute|minutes)\b")
+OPERATORS = {
+    "under": "lt", "below": "lt", "less than": "lt", "<": "lt",
+    "at most": "le", "up to": "le", "<=": "le",
+    "over": "gt", "above": "gt", "more than": "gt", ">": "gt",
+    "at least": "ge", ">=": "ge",
+}
+OP_PATTERN = "|".join(sorted(map(re.escape, OPERATORS), key=len, reverse=True))
+TIME_CLAUSE_RE = re.compile(
+    rf"(prep|cook)(?:ing)?(?: time)?\s*(?:is\s+)?({OP_PATTERN})\s*(\d+(?:\.\d+)?)\s*(h|hr|hrs|hours?|m|min|mins|minutes?)?"
+)
+MACRO_CLAUSE_RE = re.compile(rf"({OP_PATTERN})\s*(\d+(?:\.\d+)?)\s*g?\s*(cal|calories|kcal|protein|fat|carbs)")
+EXCLUDE_RE = re.compile(r"(?:no|without|exclude|not)\s+(.+)")
+INCLUDE_RE = re.compile(r"(?:with|has|contains|include)\s+(.+)")
+MACRO_FIELDS = {"cal": "cal", "calories": "cal", "kcal": "cal", "protein": "protein", "fat": "fat", "carbs": "carbs"}
+
+
+def parse_minutes(text: str | None) -> int | None:
+    if not text:
+        return None
+    text = text.lower()
+    hours = sum(float(value) for value in HOURS_RE.findall(text))
+    minutes = sum(int(value) for value in MINUTES_RE.findall(text))
+    if not hours and not minutes:
+        m = re.match(r"\s*(\d+)\s*$", text)
+        return int(m.group(1)) if m else None
+    return round(hours * 60 + minutes)
+
+
+def recipe_terms(
+    ingredient_lines: list[str], resolved: dict[str, tuple[str, FoodItem | None]]
+) -> tuple[set[str], set[str], int]:
+    foods: set[str] = set()
+    words: set[str] = set()
+    unmatched = 0
+    for line in ingredient_lines:
+        # The same lines recur across many recipes; parse each distinct one once per index build.
+        found = resolved.get(line)
+        if found is None:
+            found = resolved[line] = search_line(line)
+        ingredient_text, food = found
+        if food is not None:
+            foods.add(food.keywords[0])
+        else:
+            unmatched += 1
+        words.update(search_words(ingredient_text, food))
+    return foods, words, unmatched
+
+
+def index_inputs(paths: list[Path]) -> str:
+    # Everything build_index reads: the food tables, the section index and each recipe's stamp.
+    stamps: list[object] = [tables_digest()]
+    for path in [generate_recipe_book.INDEX, *paths]:
+        st = path.stat()
+        stamps.append((path.relative_to(ROOT).as_posix(), st.st_mtime_ns, st.st_size))
+    return hashlib.sha256(repr(stamps).encode("utf-8")).hexdigest()
+
+
+def build_index(paths: list[Path], store: RecipeStore | None = None) -> dict[str, object]:
+    store = store or generate_recipe_book.RECIPES
+    index_text = generate_recipe_book.INDEX.read_text(encoding="utf-8")
+    sections = {path: str(section["title"]) for section in parse_index_sections(index_text, generate_recipe_book.INDEX.parent) for path in section["paths"]}
+    recipes: list[list[object]] = []
+    foods: dict[str, list[int]] = {}
+    words: dict[str, list[int]] = {}
+    unmatched: list[int] = []
+    values: dict[str, list[tuple[float, int]]] = {name: [] for name in NUMERIC_FIELDS}
+    resolved: dict[str, tuple[str, FoodItem | None]] = {}
+
+    for path in paths:
+        recipe = store.load(path)
+        number = len(recipes)
+        rel = path.relative_to(ROOT).as_posix()
+        section = sections.get(path)
+        recipes.append([rel, recipe.title or path.stem, section])
+        recipe_food_keys, recipe_words, unmatched_lines = recipe_terms(recipe.ingredient_lines, resolved)
+        for food in sorted(recipe_food_keys):
+            foods.setdefault(food, []).append(number)
+        if unmatched_lines:
+            unmatched.append(number)
+        for word in sorted(recipe_words):
+            words.setdefault(word, []).append(number)
+        m = MACROS_RE.match(recipe.macro_line or "")
+        if m:
+            for name, value in zip(("cal", "protein", "fat", "carbs"), m.groups()):
+                values[name].append((int(value), number))
+        for name, label in (("prep", "prep time"), ("cook", "cook time")):
+            minutes = parse_minutes(recipe.field(label))
+            if minutes is not None:
+                values[name].append((minutes, number))
+
+    numeric = {}
+    for name, pairs in values.items():
+        pairs.sort()
+        numeric[name] = {"values": [value for value, _ in pairs], "ids": [number for _, number in pairs]}
+    return {
+        "version": INDEX_VERSION,
+        "recipes": recipes,
+        "foods": foods,
+        "words": words,
+        "unmatched": unmatched,
+        "numeric": numeric,
+    }
+
+
+def write_index(store: RecipeStore | None = None, path: Path = INDEX_PATH, force: bool = False) -> dict[str, object]:
+    paths = sorted(ROOT.glob(RECIPE_GLOB))
+    inputs = index_inputs(paths)
+    if not force:
+        index = load_index(path)
+        if index is not None and index.get("inputs") == inputs:
+            return index
+    index = build_index(paths, store)
+    index["inputs"] = inputs
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    # json.dumps encodes in C; json.dump to a file falls back to the pure-Python encoder.
+    tmp.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+    return index
+
+
+def load_index(path: Path = INDEX_PATH) -> dict[str, object] | None:
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) and index.get("version") == INDEX_VERSION else None
+
+
+@dataclass
+class Query:
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    ranges: list[tuple[str, str, float]] = field(default_factory=list)
+
+
+def parse_query(text: str) -> Query:
+    query = Query()
+    for clause in re.split(r"[,;]|\band\b", text.lower()):
+        clause = " ".join(clause.split())
+        if not clause:
+            continue
+        m = TIME_CLAUSE_RE.fullmatch(clause)
+        if m:
+            name, op, amount, unit = m.groups()
+            minutes = float(amount) * (60 if unit and unit.startswith("h") else 1)
+            query.ranges.append((name, OPERATORS[op], minutes))
+            continue
+        m = MACRO_CLAUSE_RE.fullmatch(clause)
+        if m:
+            op, amount, name = m.groups()
+            query.ranges.append((MACRO_FIELDS[name], OPERATORS[op], float(amount)))
+            continue
+        m = EXCLUDE_RE.fullmatch(clause)
+        if m:
+            query.exclude.append(m.group(1))
+            continue
+        m = INCLUDE_RE.fullmatch(clause)
+        query.include.append(m.group(1) if m else clause)
+    return query
+
+
+def word_ids(index: dict[str, object], term: str, plurals: bool = False) -> set[int]:
+    words = index["words"]
+    ids: set[int] | None = None
+    for token in re.findall(r"[a-z]+", term):
+        if token in SEARCH_STOPWORDS:
+            # The words index leaves these out ("half and half").
+            continue
+        found = set(words.get(token, ()))
+        if plurals:
+            found.update(*(words.get(token + suffix, ()) for suffix in ("s", "es")))
+        ids = found if ids is None else ids & found
+    return ids or set()
+
+
+def term_ids(index: dict[str, object], term: str) -> set[int]:
+    foods = index["foods"]
+    if term in ALLERGENS:
+        # Matched foods alone would miss lines the food table doesn't know ("1 cup shredded cheese").
+        ids = {number for food in ALLERGENS[term] for number in foods.get(food, ())}
+        ids.update(*(word_ids(index, word, plurals=True) for word in ALLERGEN_WORDS[term]))
+        return ids
+    food = find_food(term)
+    if food is not None:
+        return set(foods.get(food.keywords[0], ()))
+    return word_ids(index, term)
+
+
+def range_ids(index: dict[str, object], name: str, op: str, value: float) -> set[int]:
+    column = index["numeric"][name]
+    values = column["values"]
+    if op == "lt":
+        return set(column["ids"][: bisect_left(values, value)])
+    if op == "le":
+        return set(column["ids"][: bisect_right(values, value)])
+    if op == "gt":
+        return set(column["ids"][bisect_right(values, value):])
+    return set(column["ids"][bisect_left(values, value):])
+
+
+def run_query(index: dict[str, object], query: Query) -> list[int]:
+    matches: set[int] | None = None
+    for ids in [term_ids(index, term) for term in query.include] + [range_ids(index, *r) for r in query.ranges]:
+        matches = ids if matches is None else matches & ids
+    if matches is None:
+        matches = set(range(len(index["recipes"])))
+    for term in query.exclude:
+        matches -= term_ids(index, term)
+    return sorted(matches)
+
+
+def match_rows(index: dict[str, object], numbers: list[int], flag_unmatched: bool = False) -> list[dict[str, object]]:
+    columns = {name: dict(zip(column["ids"], column["values"])) for name, column in index["numeric"].items()}
+    unmatched = set(index["unmatched"]) if flag_unmatched else set()
+    rows = []
+    for number in numbers:
+        rel, title, section = index["recipes"][number]
+        row: dict[str, object] = {"title": title, "path": rel, "section": section}
+        row.update((name, values[number]) for name, values in columns.items() if number in values)
+        if number in unmatched:
+            row["unrecognized_ingredients"] = True
+        rows.append(row)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find recipes by ingredient, allergen, macros or prep/cook time.")
+    parser.add_argument("query", nargs="*", help='e.g. "no dairy, under 500 cal, cook time under 45 min"')
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the query index from the recipe files first")
+    parser.add_argument("--limit", type=int, default=50, help="show at most this many matches (0 = all)")
+    parser.add_argument("--json", action="store_true", help="print matches as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = None if args.rebuild else load_index()
+    if index is None:
+        index = write_index(force=args.rebuild)
+        print(f"Indexed {len(index['recipes'])} recipe(s) into {INDEX_PATH.relative_to(ROOT).as_posix()}.")
+    query = parse_query(" ".join(args.query))
+    matches = run_query(index, query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    shown = matches[: args.limit] if args.limit > 0 else matches
+    # Allergen exclusions can only vouch for ingredients they recognize; point out recipes with others.
+    allergen_filter = any(term in ALLERGENS for term in query.exclude)
+    rows = match_rows(index, shown, flag_unmatched=allergen_filter)
+    if args.json:
+        print(json.dumps(rows, indent=1, ensure_ascii=False))
+        return
+    for row in rows:
+        details = " | ".join(
+            f"{row[name]:g}{unit}" for name, unit in (("cal", " cal"), ("protein", "g protein"), ("cook", " min cook")) if name in row
+        )
+        flag = " [check allergens: unrecognized ingredients]" if row.get("unrecognized_ingredients") else ""
+        print(f"{row['title']} ({row['path']}){': ' + details if details else ''}{flag}")
+    more = f", showing {len(shown)}" if len(shown) < len(matches) else ""
+    print(f"\n{len(matches)} match(es){more} in {elapsed_ms:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
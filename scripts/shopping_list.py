@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from fractions import Fraction
+from pathlib import Path
+from typing import Iterable
+
+from auto_nutrition import FoodItem, find_food, ingredient_to_grams, parse_ingredient_line, parse_qty, servings_value
+from recipe_model import CACHE_DIR as RECIPE_CACHE_DIR, Recipe, RecipeStore
+
+ROOT = Path(__file__).resolve().parents[1]
+COUNTED_UNITS = ("can", "jar", "pkg", "unit")
+# unit -> (larger unit, how many make one, switch once the total reaches this many)
+UNIT_STEPS = {"tsp": ("tbsp", 3, 3), "tbsp": ("cup", 16, 4), "oz": ("lb", 16, 16)}
+
+# (quantity, unit, rest of the line after the quantity, matched food)
+ParsedLine = tuple[float, str, str, FoodItem | None]
+
+
+@dataclass
+class ShoppingItem:
+    food: FoodItem
+    grams: float = 0.0
+    units: Counter[str] = field(default_factory=Counter)
+    recipes: set[str] = field(default_factory=set)
+
+    def display(self) -> tuple[float, str]:
+        unit = self.units.most_common(1)[0][0]
+        qty = self.grams / ingredient_to_grams(1.0, unit, self.food)
+        while unit in UNIT_STEPS and qty >= UNIT_STEPS[unit][2]:
+            unit, per, _ = UNIT_STEPS[unit]
+            qty /= per
+        if unit in COUNTED_UNITS:
+            return float(math.ceil(qty - 1e-9)), unit
+        return math.ceil(qty * 4 - 1e-9) / 4, unit
+
+
+def format_quantity(value: float) -> str:
+    amount = Fraction(round(value * 8), 8)
+    if amount == 0:
+        return f"{value:.2g}"
+    whole, part = divmod(amount, 1)
+    if not part:
+        return str(whole)
+    return f"{whole} {part}" if whole else str(part)
+
+
+def unit_label(unit: str, qty: float) -> str:
+    if unit == "unit":
+        return ""
+    if unit in ("can", "jar", "cup") and qty > 1:
+        return f"{unit}s"
+    return unit
+
+
+def split_quantity(line: str) -> str:
+    tokens = line.strip()[2:].split()
+    skip = 1
+    if len(tokens) > 1 and parse_qty(tokens[1]) is not None:
+        skip = 2
+    return " ".join(tokens[skip:])
+
+
+class ShoppingList:
+    def __init__(self) -> None:
+        self.items: dict[FoodItem, ShoppingItem] = {}
+        self.unmatched: dict[str, tuple[float | None, set[str]]] = {}
+        self.recipes = 0
+        self.servings = 0.0
+        self._lines: dict[str, ParsedLine | None] = {}
+
+    def parse(self, line: str) -> ParsedLine | None:
+        try:
+            return self._lines[line]
+        except KeyError:
+            pass
+        parsed = parse_ingredient_line(line)
+        result = None
+        if parsed is not None:
+            qty, unit, ingredient_text = parsed
+            result = (qty, unit, split_quantity(line), find_food(ingredient_text))
+        self._lines[line] = result
+        return result
+
+    def scale_lines(self, recipe: Recipe, factor: float) -> list[str]:
+        scaled = []
+        for line in recipe.ingredient_lines:
+            parsed = self.parse(line)
+            if parsed is None:
+                scaled.append(line.strip())
+                continue
+            qty, _, rest, _ = parsed
+            scaled.append(f"- {format_quantity(qty * factor)} {rest}".rstrip())
+        return scaled
+
+    def add(self, recipe: Recipe, target_servings: float | None = None) -> float:
+        servings = servings_value(recipe.field("serves/yield"))
+        servings = servings if servings > 0 else 1
+        target = target_servings if target_servings is not None else servings
+        factor = target / servings
+        title = recipe.title or str(recipe.path)
+        for line in recipe.ingredient_lines:
+            parsed = self.parse(line)
+            if parsed is None or parsed[3] is None:
+                self._add_unmatched(line, parsed, factor, title)
+                continue
+            qty, unit, _, food = parsed
+            item = self.items.get(food)
+            if item is None:
+                item = self.items[food] = ShoppingItem(food)
+            grams = ingredient_to_grams(qty, unit, food) * factor
+            item.grams += grams
+            item.units[unit] += grams
+            item.recipes.add(title)
+        self.recipes += 1
+        self.servings += target
+        return factor
+
+    def _add_unmatched(self, line: str, parsed: ParsedLine | None, factor: float, title: str) -> None:
+        if parsed is None:
+            text, qty = line.strip()[2:].strip(), None
+        else:
+            text, qty = parsed[2], parsed[0] * factor
+        total, titles = self.unmatched.get(text, (None, set()))
+        if qty is not None:
+            total = (total or 0.0) + qty
+        titles.add(title)
+        self.unmatched[text] = (total, titles)
+
+    def rows(self) -> list[dict[str, object]]:
+        rows = []
+        for item in sorted(self.items.values(), key=lambda item: item.food.keywords[0]):
+            qty, unit = item.display()
+            rows.append({
+                "food": item.food.keywords[0],
+                "quantity": qty,
+                "unit": unit,
+                "grams": round(item.grams),
+                "recipes": sorted(item.recipes),
+            })
+        return rows
+
+
+def parse_plan(entries: Iterable[str]) -> list[tuple[Path, float | None]]:
+    plan: list[tuple[Path, float | None]] = []
+    for entry in entries:
+        entry = entry.split("#", 1)[0].strip()
+        if not entry:
+            continue
+        name, sep, servings = entry.replace("=", " ").rpartition(" ")
+        if not sep:
+            name, servings = servings, ""
+        try:
+            target = float(servings) if servings else None
+        except ValueError:
+            name, target = entry, None
+        path = Path(name.strip())
+        if not path.exists() and (ROOT / path).exists():
+            path = ROOT / path
+        plan.append((path, target))
+    return plan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scale recipes to a headcount and print one combined shopping list.")
+    parser.add_argument("recipes", nargs="*", help="recipe files, optionally as PATH=SERVINGS")
+    parser.add_argument("--plan", type=Path, help="file with one 'PATH SERVINGS' per line (# comments allowed)")
+    parser.add_argument("--servings", type=float, help="target servings for recipes without their own")
+    parser.add_argument("--show-scaled", action="store_true", help="also print each recipe's scaled ingredients")
+    parser.add_argument("--json", action="store_true", help="print the list as JSON")
+    args = parser.parse_args()
+
+    entries = list(args.recipes)
+    if args.plan:
+        entries.extend(args.plan.read_text(encoding="utf-8").splitlines())
+    plan = parse_plan(entries)
+    if not plan:
+        parser.error("no recipes given")
+
+    store = RecipeStore(RECIPE_CACHE_DIR)
+    shopping = ShoppingList()
+    scaled: list[tuple[Recipe, float, list[str]]] = []
+    for path, target in plan:
+        if not path.exists():
+            parser.error(f"recipe not found: {path}")
+        recipe = store.load(path)
+        factor = shopping.add(recipe, target if target is not None else args.servings)
+        if args.show_scaled:
+            scaled.append((recipe, factor, shopping.scale_lines(recipe, factor)))
+
+    rows = shopping.rows()
+    if args.json:
+        unmatched = [
+            {"ingredient": text, "quantity": qty, "recipes": sorted(titles)}
+            for text, (qty, titles) in sorted(shopping.unmatched.items())
+        ]
+        print(json.dumps({"recipes": shopping.recipes, "servings": shopping.servings, "items": rows, "unmatched": unmatched}, indent=1))
+        return
+
+    for recipe, factor, lines in scaled:
+        print(f"## {recipe.title} (x{factor:.2f})")
+        print("\n".join(lines))
+        print()
+    print(f"Shopping list for {shopping.recipes} recipe(s), {shopping.servings:g} serving(s):")
+    for row in rows:
+        label = unit_label(row["unit"], row["quantity"])
+        amount = f"{format_quantity(row['quantity'])} {label}".strip()
+        print(f"- {row['food']}: {amount} (~{row['grams']} g)")
+    if shopping.unmatched:
+        print("\nAlso needed (not matched to a food, check by hand):")
+        for text, (qty, titles) in sorted(shopping.unmatched.items()):
+            amount = f"{format_quantity(qty)} " if qty is not None else ""
+            print(f"- {amount}{text} ({', '.join(sorted(titles))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Iterable
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STYLE_RE = re.compile(r"<style>(.*?)</style>", re.S)
+SCRIPT_RE = re.compile(r"(<script\b[^>]*>)(.*?)(</script>)", re.S)
+BETWEEN_TAGS_RE = re.compile(r">\s*\n\s*<")
+EDGE_SPACE_RE = re.compile(r"^\s*\n\s*|\s*\n\s*$")
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+CSS_SPACE_RE = re.compile(r"\s+")
+CSS_PUNCT_RE = re.compile(r"\s*([{};:,>])\s*")
+SEARCH_FETCH = 'fetch("search-index.json")'
+
+
+def minify_css(css: str) -> str:
+    css = CSS_COMMENT_RE.sub("", css)
+    css = CSS_SPACE_RE.sub(" ", css)
+    css = CSS_PUNCT_RE.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_script(script: str) -> str:
+    # Keep line breaks so automatic semicolon insertion still sees the same statements.
+    return "\n".join(line.strip() for line in script.splitlines() if line.strip())
+
+
+def minify_html(text: str) -> str:
+    def markup(chunk: str) -> str:
+        return EDGE_SPACE_RE.sub("", BETWEEN_TAGS_RE.sub("><", chunk))
+
+    parts: list[str] = []
+    position = 0
+    for m in SCRIPT_RE.finditer(text):
+        parts.append(markup(text[position:m.start()]))
+        parts.append(m.group(1) + minify_script(m.group(2)) + m.group(3))
+        position = m.end()
+    parts.append(markup(text[position:]))
+    return "".join(parts)
+
+
+def hashed_name(stem: str, suffix: str, data: bytes) -> str:
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{suffix}"
+
+
+def write_bytes_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+def compress(path: Path, data: bytes) -> tuple[int, int | None]:
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    write_bytes_if_changed(path.with_name(path.name + ".gz"), gz)
+    if brotli is None:
+        return len(gz), None
+    br = brotli.compress(data, quality=11)
+    write_bytes_if_changed(path.with_name(path.name + ".br"), br)
+    return len(gz), len(br)
+
+
+class SiteOptimizer:
+    def __init__(self, docs: Path) -> None:
+        self.docs = docs
+        self.assets: list[Path] = []
+        self.report: list[tuple[Path, int, int, int, int | None]] = []
+        self._stylesheets: dict[str, Path] = {}
+        self._search_name: str | None = None
+
+    def _emit(self, path: Path, raw_size: int, data: bytes, write: bool = True) -> None:
+        if write:
+            write_bytes_if_changed(path, data)
+            self.assets.append(path)
+        gz, br = compress(path, data)
+        self.assets.append(path.with_name(path.name + ".gz"))
+        if br is not None:
+            self.assets.append(path.with_name(path.name + ".br"))
+        self.report.append((path, raw_size, len(data), gz, br))
+
+    def search_index(self, path: Path) -> None:
+        raw = path.read_bytes()
+        self._search_name = hashed_name(path.stem, path.suffix, raw)
+        self._emit(path.with_name(self._search_name), len(raw), raw)
+
+    def page(self, path: Path, text: str) -> str:
+        raw_size = len(text.encode("utf-8"))
+        m = STYLE_RE.search(text)
+        if m:
+            css = minify_css(m.group(1))
+            stylesheet = self._stylesheets.get(css)
+            if stylesheet is None:
+                data = css.encode("utf-8")
+                stylesheet = self._stylesheets[css] = self.docs / "assets" / hashed_name("site", ".css", data)
+                self._emit(stylesheet, len(m.group(1).encode("utf-8")), data)
+            href = Path(os.path.relpath(stylesheet, path.parent)).as_posix()
+            text = f'{text[:m.start()]}<link rel="stylesheet" href="{href}">{text[m.end():]}'
+        if self._search_name is not None:
+            text = text.replace(SEARCH_FETCH, f'fetch("{self._search_name}")')
+        text = minify_html(text)
+        # The page itself goes through the caller's OutputFile, which skips unchanged bytes.
+        self._emit(path, raw_size, text.encode("utf-8"), write=False)
+        return text
+
+
+def remove_stale_assets(docs: Path, previous: Iterable[Path], keep: Iterable[Path] = ()) -> list[Path]:
+    # Only files an earlier optimized build recorded are candidates; anything else under docs is left alone.
+    keep = set(keep)
+    stale = [path for path in previous if path not in keep and path.exists()]
+    for path in stale:
+        path.unlink()
+    assets = docs / "assets"
+    if assets.is_dir() and not any(assets.iterdir()):
+        assets.rmdir()
+    return stale
+
+
+def print_report(report: list[tuple[Path, int, int, int, int | None]], root: Path) -> None:
+    print(f"  {'file':<44}{'raw':>10}{'minified':>10}{'gzip':>10}{'brotli':>10}")
+    totals = [0, 0, 0, 0]
+    for path, raw, minified, gz, br in report:
+        name = Path(os.path.relpath(path, root)).as_posix()
+        print(f"  {name:<44}{raw:>10}{minified:>10}{gz:>10}{br if br is not None else '-':>10}")
+        totals = [totals[0] + raw, totals[1] + minified, totals[2] + gz, totals[3] + (br or 0)]
+    br_total = totals[3] if brotli is not None else "-"
+    print(f"  {'total':<44}{totals[0]:>10}{totals[1]:>10}{totals[2]:>10}{br_total:>10}")
+    if brotli is None:
+        print("  (install the brotli package to also write .br files)")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import auto_nutrition
+import generate_recipe_book
+from recipe_model import RecipeStore
+
+POLL_SECONDS = 0.2
+DEBOUNCE_SECONDS = 0.3
+
+Snapshot = dict[str, tuple[int, int]]
+
+
+def _scan(folder: Path, recursive: bool, snapshot: Snapshot) -> None:
+    try:
+        entries = os.scandir(folder)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    with entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                if recursive:
+                    _scan(Path(entry.path), recursive, snapshot)
+            elif entry.name.endswith(".md"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+
+
+def take_snapshot() -> Snapshot:
+    root = generate_recipe_book.ROOT
+    snapshot: Snapshot = {}
+    _scan(root / "recipes", True, snapshot)
+    _scan(root / "docs", False, snapshot)
+    try:
+        st = generate_recipe_book.INDEX.stat()
+    except FileNotFoundError:
+        pass
+    else:
+        snapshot[str(generate_recipe_book.INDEX)] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def changed_paths(before: Snapshot, after: Snapshot) -> list[Path]:
+    return sorted(Path(path) for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+
+def wait_for_changes(current: Snapshot, poll: float, debounce: float) -> Snapshot:
+    latest = current
+    while latest == current:
+        time.sleep(poll)
+        latest = take_snapshot()
+    # Editors often save in bursts (temp file, rename, touch); wait until the tree is quiet.
+    while True:
+        time.sleep(debounce)
+        settled = take_snapshot()
+        if settled == latest:
+            return settled
+        latest = settled
+
+
+def watch(
+    store: RecipeStore,
+    use_cache: bool = True,
+    pages: bool = False,
+    per_recipe: bool = False,
+    poll: float = POLL_SECONDS,
+    debounce: float = DEBOUNCE_SECONDS,
+) -> None:
+    root = generate_recipe_book.ROOT
+    recipes_dir = root / "recipes"
+    cache = None
+    if use_cache:
+        cache = auto_nutrition.NutritionCache(auto_nutrition.CACHE_PATH)
+        cache.load()
+        # Only edited recipes are re-estimated; keep the others' entries.
+        cache.seen.update(cache.entries)
+        auto_nutrition.LINE_CACHE.restore(cache.lines)
+    book = generate_recipe_book.IncrementalBook()
+
+    def rebuild(changed: list[Path] | None = None) -> list[Path]:
+        if pages or per_recipe:
+            generate_recipe_book.build_book(pages=pages, per_recipe=per_recipe)
+            return []
+        return book.build(changed)
+
+    rebuild()
+    current = take_snapshot()
+    print(f"Watching {len(current)} markdown file(s) for changes (Ctrl+C to stop).")
+    try:
+        while True:
+            latest = wait_for_changes(current, poll, debounce)
+            changed = changed_paths(current, latest)
+            start = time.perf_counter()
+            try:
+                for path in changed:
+                    if str(path) in latest and path.is_relative_to(recipes_dir):
+                        updated, msg = auto_nutrition.process_recipe(path, cache, store)
+                        if updated:
+                            # Record our own macro-line write so it doesn't trigger another round.
+                            st = path.stat()
+                            latest[str(path)] = (st.st_mtime_ns, st.st_size)
+                            print(msg)
+                written = rebuild(changed)
+            except (OSError, ValueError) as exc:
+                print(f"Rebuild failed: {exc}")
+                written = []
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            current = latest
+            names = ", ".join(path.relative_to(root).as_posix() for path in written) or "no files changed"
+            print(f"{len(changed)} change(s) rebuilt in {elapsed_ms:.1f} ms ({book.rendered} block(s) re-rendered): {names}.")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        if cache is not None:
+            cache.save(auto_nutrition.LINE_CACHE)
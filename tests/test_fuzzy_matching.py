@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from auto_nutrition import FOOD_MATCHER, resolve_ingredient_line  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "text, keyword",
+    [
+        ("mozarella", "mozzarella"),
+        ("brocoli", "broccoli"),
+        ("chedar cheese", "cheddar cheese"),
+        ("parmesean", "parmesan"),
+        ("tomatos", "diced tomatoes"),
+    ],
+)
+def test_misspellings_are_corrected(text: str, keyword: str) -> None:
+    food = FOOD_MATCHER.find(text)
+    assert food is not None and food.keywords[0] == keyword
+
+
+@pytest.mark.parametrize(
+    "text, keyword",
+    [("tomato", "diced tomatoes"), ("1 large tomato, diced", "diced tomatoes"), ("tomato paste", "tomato paste")],
+)
+def test_singular_reaches_plural_keywords(text: str, keyword: str) -> None:
+    food = FOOD_MATCHER.find(text)
+    assert food is not None and food.keywords[0] == keyword
+
+
+@pytest.mark.parametrize("text", ["peach", "beets", "salsa", "pears", "celeriac", "butternut squash"])
+def test_near_misses_stay_unmatched(text: str) -> None:
+    assert FOOD_MATCHER.find(text) is None
+    assert FOOD_MATCHER.corrections(text) == []
+
+
+@pytest.mark.parametrize("line", ["- 2 cups butternut squash", "- 1 lb beets", "- 3 pears, sliced"])
+def test_near_miss_lines_add_no_macros(line: str) -> None:
+    assert resolve_ingredient_line(line) is None